@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("achievement", "0002_initial"),
+        ("resume", "0011_resume_user_primary_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="achievement",
+            index=models.Index(
+                fields=["resume", "order", "-id"], name="achievement_resume_order_idx"
+            ),
+        ),
+    ]
@@ -31,6 +31,9 @@ class Achievement(models.Model):
         verbose_name = 'Достижение'
         verbose_name_plural = 'Достижения'
         ordering = ['order', '-date']
+        indexes = [
+            models.Index(fields=['resume', 'order', '-id'], name='achievement_resume_order_idx'),
+        ]
 
     def __str__(self):
         return self.title
\ No newline at end of file
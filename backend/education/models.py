@@ -42,6 +42,10 @@ class Education(models.Model):
         verbose_name = 'Образование'
         verbose_name_plural = 'Образование'
         ordering = ['order', '-start_date']
+        indexes = [
+            # Порядок BaseResumeItemViewSet.get_queryset; такой же индекс у остальных секций резюме
+            models.Index(fields=['resume', 'order', '-id'], name='education_resume_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.institution} - {self.degree}"
\ No newline at end of file
@@ -38,6 +38,9 @@ class Language(models.Model):
         verbose_name = 'Язык'
         verbose_name_plural = 'Языки'
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['resume', 'order', '-id'], name='language_resume_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.language} ({self.get_proficiency_level_display()})"
\ No newline at end of file
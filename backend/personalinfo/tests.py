@@ -1,3 +1,34 @@
-from django.test import TestCase
+from django.urls import reverse
+from resumebuilder.testing import QueryBudgetTestCase
+from resume.models import Resume
+from .models import PersonalInfo
 
-# Create your tests here.
+
+class PersonalInfoQueryBudgetTest(QueryBudgetTestCase):
+    """Бюджет запросов маршрутов личной информации: api/resumes/<resume_id>/personal-info/"""
+
+    data = {'full_name': 'Пётр Петров', 'email': 'petr@example.com', 'phone': '+996 555 111 111'}
+
+    def test_personal_info(self):
+        url = reverse('personalinfo:create_update', args=[self.resume.pk])
+        self.assertQueryBudget(2, 'get', url)
+        self.assertQueryBudget(4, 'put', url, self.data)
+        self.assertQueryBudget(4, 'patch', url, {'summary': 'Новое описание'})
+
+    def test_create_delete(self):
+        def without_info():
+            return Resume.objects.create(user=self.owner, template=self.template, title='Пустое резюме')
+
+        def with_info():
+            resume = without_info()
+            PersonalInfo.objects.create(resume=resume, full_name='Иван Иванов')
+            return resume
+
+        self.assertQueryBudget(
+            4, 'post', lambda resume: reverse('personalinfo:create_update', args=[resume.pk]), self.data,
+            status_code=201, prepare=without_info
+        )
+        self.assertQueryBudget(
+            4, 'delete', lambda resume: reverse('personalinfo:delete', args=[resume.pk]),
+            status_code=204, prepare=with_info
+        )
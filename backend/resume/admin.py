@@ -1,5 +1,5 @@
 from django.contrib import admin
-from resume.models import Resume
+from resume.models import Resume, ExportJob
 from personalinfo.models import PersonalInfo
 from education.models import Education
 from workexperlence.models import WorkExperience
@@ -131,4 +131,19 @@ class ResumeAdmin(admin.ModelAdmin):
         """Все поля только для чтения"""
         if obj:
             return self.readonly_fields
-        return self.readonly_fields
\ No newline at end of file
+        return self.readonly_fields
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Просмотр фоновых задач экспорта"""
+    list_display = ('id', 'resume', 'user', 'export_format', 'status', 'created_at', 'finished_at')
+    list_filter = ('status', 'export_format', 'created_at')
+    search_fields = ('resume__title', 'user__username')
+    readonly_fields = ('id', 'resume', 'user', 'export_format', 'status', 'file', 'error',
+                       'created_at', 'started_at', 'finished_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,78 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeTaskQueue:
+    """
+    Фоновая очередь задач по резюме в одном потоке процесса.
+    Задача ставится после фиксации транзакции; несколько постановок
+    для одного резюме до запуска задачи схлопываются в одну.
+    С задержкой (delay) каждая новая постановка откладывает запуск,
+    поэтому серия изменений подряд даёт один запуск после последнего
+    """
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._timers = {}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+            return self._executor
+
+    def _submit(self, key, func, *args):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._get_executor().submit(self._run, key, func, *args)
+
+    def _submit_later(self, resume_id, delay):
+        def fire():
+            with self._lock:
+                # Таймер, отменённый после срабатывания, уже заменён новым
+                if self._timers.get(resume_id) is not timer:
+                    return
+                del self._timers[resume_id]
+            self._submit(resume_id, self.func, resume_id)
+
+        with self._lock:
+            previous = self._timers.get(resume_id)
+            if previous is not None:
+                previous.cancel()
+            timer = threading.Timer(delay, fire)
+            timer.daemon = True
+            self._timers[resume_id] = timer
+        timer.start()
+
+    def _run(self, key, func, *args):
+        with self._lock:
+            # Изменения, сделанные во время выполнения, поставят задачу снова
+            self._pending.discard(key)
+        close_old_connections()
+        try:
+            func(*args)
+        except Exception:
+            logger.exception('Task %s for %s failed', self.name, key)
+        finally:
+            close_old_connections()
+
+    def schedule(self, resume_id, delay=0):
+        """Поставить задачу в очередь после фиксации текущей транзакции (и ещё через delay сек)"""
+        if delay:
+            transaction.on_commit(lambda: self._submit_later(resume_id, delay))
+        else:
+            transaction.on_commit(lambda: self._submit(resume_id, self.func, resume_id))
+
+    def schedule_call(self, key, func, *args):
+        """Выполнить func(*args) в потоке очереди после фиксации транзакции; схлопывается по key"""
+        transaction.on_commit(lambda: self._submit(key, func, *args))
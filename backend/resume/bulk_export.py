@@ -0,0 +1,48 @@
+import os
+import time
+
+
+# Функции процессов пула manage.py export_resumes.
+# Дочерний процесс импортирует этот модуль до django.setup(),
+# поэтому модели и всё, что их использует, импортируются внутри функций
+
+
+def init_worker(settings_module):
+    """Инициализация процесса пула: настройка Django без вложенного пула рендеринга"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+    from .render_pool import disable_render_pool
+    disable_render_pool()
+
+
+def export_one(task):
+    """Экспорт одного резюме во все указанные форматы"""
+    from django.db import connections
+    from .models import Resume
+    from .loaders import load_resume_for_export
+    from .export_utils import EXPORT_GENERATORS, export_resume, export_filename
+
+    resume_id, formats, output_dir = task
+    started = time.monotonic()
+    errors = []
+
+    for export_format in formats:
+        try:
+            resume = load_resume_for_export(export_format, pk=resume_id)
+            if output_dir:
+                content = EXPORT_GENERATORS[export_format](resume).read()
+                path = os.path.join(output_dir, export_filename(resume.pk, resume.title, export_format))
+                with open(path, 'wb') as output_file:
+                    output_file.write(content)
+            else:
+                # Без каталога файлы только прогревают кэш экспорта
+                export_resume(resume, export_format)
+        except Resume.DoesNotExist:
+            errors.append(f'{export_format}: резюме удалено')
+        except Exception as e:
+            errors.append(f'{export_format}: {e}')
+
+    connections.close_all()
+    return resume_id, errors, time.monotonic() - started
@@ -0,0 +1,65 @@
+import hashlib
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+
+def make_etag(*parts, weak=False):
+    """
+    ETag из значений, от которых зависит ответ.
+    В parts передаётся и формат ответа (request.accepted_renderer.format):
+    у JSON и MessagePack представлений одного ресурса разные ETag
+    """
+    digest = hashlib.sha256(
+        '\0'.join(str(part) for part in parts).encode('utf-8')
+    ).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def not_modified_response(request, etag):
+    """Ответ 304, если ETag совпадает с If-None-Match запроса, иначе None"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not etag or not if_none_match:
+        return None
+    # If-None-Match сравнивается слабо: признак W/ не учитывается
+    etags = parse_etags(if_none_match)
+    if '*' in etags or _strip_weak(etag) in {_strip_weak(tag) for tag in etags}:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Accept',))
+        return response
+    return None
+
+
+def set_etag(response, etag):
+    """Заголовки для повторной проверки ответа по ETag"""
+    if etag and response.status_code == 200:
+        response['ETag'] = etag
+        # no-cache: браузер хранит ответ, но каждый раз проверяет его через If-None-Match
+        response['Cache-Control'] = 'private, no-cache'
+        # Один адрес отдаётся в JSON и MessagePack: кэши различают их по Accept
+        patch_vary_headers(response, ('Accept',))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы по ETag.
+    get_etag вычисляет ETag лёгким запросом к БД, без загрузки связанных данных;
+    при совпадении с If-None-Match тело ответа не формируется вовсе
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_etag(super().get(request, *args, **kwargs), etag)
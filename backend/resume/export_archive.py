@@ -0,0 +1,118 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.conf import settings
+from django.db import connections
+from .models import Resume
+from .loaders import load_resume_for_export
+from .export_utils import export_resume, export_filename
+
+
+def get_archive_workers():
+    """Количество параллельных рендеров при сборке архива (settings.EXPORT_ARCHIVE)"""
+    return getattr(settings, 'EXPORT_ARCHIVE', {}).get('WORKERS', 4)
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Поток только для записи: zipfile пишет в него, а генератор забирает
+    накопленные байты после каждой записи. seek не поддерживается, поэтому
+    zipfile использует data descriptor и не возвращается к началу архива
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _render_entry(resume_id, user_id, export_format):
+    """Рендеринг одного файла архива"""
+    resume = load_resume_for_export(export_format, pk=resume_id, user_id=user_id)
+    content, _ = export_resume(resume, export_format)
+    return content
+
+
+def _render_entry_in_thread(resume_id, user_id, export_format):
+    try:
+        return _render_entry(resume_id, user_id, export_format)
+    finally:
+        # Соединения потоков пула не переиспользуются после ответа
+        connections.close_all()
+
+
+def stream_resume_archive(user, formats, workers=None):
+    """
+    Генератор ZIP-архива со всеми резюме пользователя.
+    Файлы рендерятся параллельно и попадают в архив по мере готовности;
+    в памяти одновременно находятся только файлы, которые рендерятся сейчас
+    """
+    workers = workers or get_archive_workers()
+    tasks = [
+        (resume_id, title, export_format)
+        for resume_id, title in Resume.objects.filter(user=user).values_list('pk', 'title')
+        for export_format in formats
+    ]
+
+    buffer = _StreamBuffer()
+    archive = zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED)
+
+    def add_entry(name, content):
+        # PDF и DOCX уже сжаты, поэтому файлы кладутся без компрессии
+        archive.writestr(name, content)
+
+    if workers <= 1:
+        for resume_id, title, export_format in tasks:
+            name = export_filename(resume_id, title, export_format)
+            try:
+                add_entry(name, _render_entry(resume_id, user.pk, export_format))
+            except Exception as e:
+                add_entry(f'{name}.error.txt', f'Ошибка при генерации файла: {e}')
+            yield buffer.pop()
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export-archive')
+        try:
+            queue = iter(tasks)
+            pending = {}
+
+            def submit_next():
+                task = next(queue, None)
+                if task is not None:
+                    resume_id, title, export_format = task
+                    future = executor.submit(_render_entry_in_thread, resume_id, user.pk, export_format)
+                    pending[future] = export_filename(resume_id, title, export_format)
+
+            # Ограниченное окно задач: готовые файлы не копятся в памяти
+            for _ in range(workers):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        add_entry(name, future.result())
+                    except Exception as e:
+                        add_entry(f'{name}.error.txt', f'Ошибка при генерации файла: {e}')
+                    submit_next()
+                    yield buffer.pop()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    archive.close()
+    yield buffer.pop()
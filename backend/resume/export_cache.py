@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from django.conf import settings
+from .loaders import get_render_relations
+
+
+# Версия формата ключа: увеличьте при изменении логики рендеринга,
+# чтобы старые файлы кэша перестали находиться
+CACHE_KEY_VERSION = 4
+
+
+def _row_values(obj):
+    """Значения всех полей записи, кроме служебных"""
+    return [
+        getattr(obj, field.attname)
+        for field in obj._meta.concrete_fields
+        if field.name not in ('id', 'resume')
+    ]
+
+
+def _resume_payload(resume, relations):
+    """Данные резюме, от которых зависит результат экспорта"""
+    personal_info = getattr(resume, 'personal_info', None)
+    payload = {
+        'title': resume.title,
+        'template_id': resume.template_id,
+        'personal_info': _row_values(personal_info) if personal_info else None,
+    }
+    # Секции, которых нет в шаблоне, на результат не влияют и не загружаются
+    for relation in relations:
+        payload[relation] = [_row_values(item) for item in getattr(resume, relation).all()]
+    return payload
+
+
+_photo_digests = {}
+_photo_digests_lock = threading.Lock()
+
+
+def _photo_digest(resume):
+    """Хэш содержимого фотографии (кэшируется по пути, размеру и mtime файла)"""
+    if not resume.photo:
+        return b''
+    try:
+        path = resume.photo.path
+        stat = os.stat(path)
+    except (ValueError, NotImplementedError, OSError):
+        return str(resume.photo).encode('utf-8')
+
+    marker = (path, stat.st_size, stat.st_mtime_ns)
+    with _photo_digests_lock:
+        digest = _photo_digests.get(marker)
+    if digest is not None:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as photo_file:
+        for chunk in iter(lambda: photo_file.read(64 * 1024), b''):
+            h.update(chunk)
+    digest = h.digest()
+    with _photo_digests_lock:
+        _photo_digests[marker] = digest
+    return digest
+
+
+def build_cache_key(resume, export_format):
+    """
+    Ключ кэша экспорта: хэш данных резюме, HTML/CSS шаблона и байтов фото.
+    Любое изменение содержимого даёт новый ключ, поэтому инвалидация не нужна.
+    """
+    h = hashlib.sha256()
+    h.update(f'v{CACHE_KEY_VERSION}:{export_format}\0'.encode('utf-8'))
+
+    template = resume.template
+    if template:
+        h.update(template.html_structure.encode('utf-8'))
+        h.update(b'\0')
+        h.update(template.css_styles.encode('utf-8'))
+    h.update(b'\0')
+
+    relations = get_render_relations(template, export_format)
+    h.update(json.dumps(_resume_payload(resume, relations), sort_keys=True, default=str).encode('utf-8'))
+    h.update(b'\0')
+    h.update(_photo_digest(resume))
+    return h.hexdigest()
+
+
+class ExportCache:
+    """
+    Дисковый кэш готовых файлов экспорта с ограничением размера.
+    Вытеснение LRU: при попадании обновляется mtime файла,
+    при превышении бюджета удаляются самые давно использованные файлы.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = str(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key, export_format):
+        return os.path.join(self.directory, f'{key}.{export_format}')
+
+    def get(self, key, export_format):
+        """Получить содержимое файла из кэша или None"""
+        path = self._path(key, export_format)
+        try:
+            with open(path, 'rb') as cached_file:
+                data = cached_file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def set(self, key, export_format, data):
+        """Сохранить файл в кэш (атомарно) и при необходимости вытеснить старые"""
+        if len(data) > self.max_size:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, self._path(key, export_format))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Удаляет самые давно использованные файлы, пока кэш не уложится в бюджет"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self):
+        """Очистить кэш полностью"""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def stats(self):
+        """Счётчики попаданий/промахов текущего процесса"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'size': self._size if self._size is not None else self._scan_size(),
+                'max_size': self.max_size,
+            }
+
+
+_export_cache = None
+
+
+def get_export_cache():
+    """Общий для процесса экземпляр кэша, настроенный через settings.EXPORT_CACHE"""
+    global _export_cache
+    if _export_cache is None:
+        config = getattr(settings, 'EXPORT_CACHE', {})
+        _export_cache = ExportCache(
+            directory=config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'exports')),
+            max_size=config.get('MAX_SIZE', 512 * 1024 * 1024),
+        )
+    return _export_cache
@@ -0,0 +1,162 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import ExportJob
+from .export_utils import export_resume
+from .loaders import load_resume_for_export
+
+logger = logging.getLogger(__name__)
+
+
+def get_jobs_config():
+    """Настройки очереди экспорта из settings.EXPORT_JOBS"""
+    config = getattr(settings, 'EXPORT_JOBS', {})
+    return {
+        # 'thread' - пул потоков внутри процесса (одна машина, без брокера)
+        # 'db' - задачи ждут в таблице, их забирает manage.py run_export_worker
+        'BACKEND': config.get('BACKEND', 'thread'),
+        'WORKERS': config.get('WORKERS', 2),
+        # Через сколько секунд задача в работе считается брошенной (процесс убит или перезапущен)
+        'RUNNING_TIMEOUT': config.get('RUNNING_TIMEOUT', 600),
+        # Сколько секунд хранятся завершённые задачи и их файлы
+        'RESULT_TTL': config.get('RESULT_TTL', 24 * 3600),
+    }
+
+
+def fail_stale_jobs():
+    """
+    Завершить с ошибкой задачи, которые выполняются дольше RUNNING_TIMEOUT:
+    процесс, который их выполнял, был остановлен. С BACKEND = 'thread' так же
+    завершаются задачи, ждущие в очереди дольше RUNNING_TIMEOUT: очередь пула
+    потоков не переживает перезапуск процесса. Возвращает число задач
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=get_jobs_config()['RUNNING_TIMEOUT'])
+    stale = Q(status=ExportJob.STATUS_RUNNING, started_at__lt=cutoff)
+    if get_jobs_config()['BACKEND'] == 'thread':
+        stale |= Q(status=ExportJob.STATUS_PENDING, created_at__lt=cutoff)
+    return ExportJob.objects.filter(stale).update(
+        status=ExportJob.STATUS_FAILED,
+        error='Задача прервана: превышено время выполнения',
+        finished_at=now
+    )
+
+
+def delete_expired_jobs():
+    """Удалить завершённые задачи старше RESULT_TTL вместе с файлами. Возвращает число задач"""
+    expired = ExportJob.objects.filter(
+        status__in=[ExportJob.STATUS_DONE, ExportJob.STATUS_FAILED],
+        finished_at__lt=timezone.now() - timedelta(seconds=get_jobs_config()['RESULT_TTL'])
+    )
+    deleted = 0
+    for job in expired.only('pk', 'file').iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted += 1
+    return deleted
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_jobs_config()['WORKERS'],
+                thread_name_prefix='export-job'
+            )
+            # Задачи потоков прошлого запуска процесса: давние - в ошибку,
+            # остальные ставятся в пул заново (claim_job не даст выполнить задачу дважды)
+            fail_stale_jobs()
+            pending_ids = ExportJob.objects.filter(
+                status=ExportJob.STATUS_PENDING
+            ).order_by('created_at').values_list('pk', flat=True)
+            for job_id in pending_ids:
+                _executor.submit(_run_in_thread, job_id)
+        return _executor
+
+
+def enqueue_export(resume, export_format, user):
+    """
+    Поставить экспорт резюме в очередь.
+    Если такая же задача уже ждёт или выполняется, возвращается она;
+    брошенные задачи (в очереди или в работе дольше RUNNING_TIMEOUT) не учитываются.
+    """
+    cutoff = timezone.now() - timedelta(seconds=get_jobs_config()['RUNNING_TIMEOUT'])
+    active_job = ExportJob.objects.filter(
+        Q(status=ExportJob.STATUS_PENDING, created_at__gte=cutoff) |
+        Q(status=ExportJob.STATUS_RUNNING, started_at__gte=cutoff),
+        resume=resume,
+        export_format=export_format
+    ).first()
+    if active_job:
+        return active_job
+
+    job = ExportJob.objects.create(resume=resume, user=user, export_format=export_format)
+
+    if get_jobs_config()['BACKEND'] == 'thread':
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+    return job
+
+
+def claim_job(job_id):
+    """
+    Атомарно перевести задачу из очереди в работу.
+    Условный UPDATE гарантирует, что задачу заберёт только один воркер.
+    """
+    claimed = ExportJob.objects.filter(
+        pk=job_id,
+        status=ExportJob.STATUS_PENDING
+    ).update(status=ExportJob.STATUS_RUNNING, started_at=timezone.now())
+    return claimed == 1
+
+
+def claim_next_job():
+    """Забрать самую старую задачу из очереди (для воркера с DB-брокером)"""
+    pending_ids = ExportJob.objects.filter(
+        status=ExportJob.STATUS_PENDING
+    ).order_by('created_at').values_list('pk', flat=True)[:10]
+
+    for job_id in pending_ids:
+        if claim_job(job_id):
+            return ExportJob.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """Выполнить экспорт и сохранить результат в задаче"""
+    try:
+        resume = load_resume_for_export(job.export_format, pk=job.resume_id)
+
+        content, _ = export_resume(resume, job.export_format)
+        job.file.save(f'{job.pk}.{job.export_format}', ContentFile(content), save=False)
+        job.status = ExportJob.STATUS_DONE
+        job.error = ''
+    except Exception as e:
+        logger.exception('Export job %s failed', job.pk)
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+    return job
+
+
+def _run_in_thread(job_id):
+    """Точка входа задачи в пуле потоков"""
+    close_old_connections()
+    try:
+        if claim_job(job_id):
+            run_job(ExportJob.objects.get(pk=job_id))
+    finally:
+        close_old_connections()
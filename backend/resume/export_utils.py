@@ -1,83 +1,37 @@
+import logging
+import re
 from io import BytesIO
 from django.template.loader import render_to_string
-from weasyprint import HTML
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from resumebuilder.timing import timed
+from .export_cache import build_cache_key, get_export_cache
+from .render_pool import render_pdf
+from .photo_renditions import get_photo_url, get_renditions_config
+from .template_compiler import get_compiled_template, PERSONAL_INFO_PLACEHOLDERS
 
-def generate_html_from_template(resume):
+logger = logging.getLogger(__name__)
+
+
+def _photo_url(resume):
     """
-    Генерирует HTML с подстановкой данных резюме в шаблон
+    URL фотографии для подстановки в шаблон.
+    Вместо base64 в HTML попадает ссылка на уменьшенную копию,
+    которую WeasyPrint получает через url_fetcher пула рендеринга.
+    Без копии (файла нет) - пустая строка: шаблон выводит ветку {{else}}
     """
-    template = resume.template
-    html = template.html_structure
-    css = template.css_styles
-    
-    # Получаем данные
-    personal_info = getattr(resume, 'personal_info', None)
-    education = resume.education.all()
-    work_experience = resume.work_experience.all()
-    skills = resume.skills.all()
-    achievements = resume.achievements.all()
-    languages = resume.languages.all()
-    
-    # ============= ИСПРАВЛЕНИЕ ФОТО =============
-    if resume.photo:
-        # Получаем ПОЛНЫЙ путь к фото
-        try:
-            # Если это объект ImageField
-            if hasattr(resume.photo, 'path'):
-                import base64
-                with open(resume.photo.path, 'rb') as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                    # Определяем тип изображения
-                    ext = resume.photo.name.split('.')[-1].lower()
-                    mime_type = f'image/{ext}' if ext in ['jpg', 'jpeg', 'png', 'webp'] else 'image/jpeg'
-                    photo_url = f'data:{mime_type};base64,{img_data}'
-            else:
-                photo_url = str(resume.photo)
-        except Exception as e:
-            print(f"Error loading photo: {e}")
-            photo_url = ''
-        
-        if photo_url:
-            html = html.replace('{{photo}}', photo_url)
-            html = html.replace('{{#if photo}}', '')
-            html = html.replace('{{else}}', '<!--')
-            html = html.replace('{{/if}}', '-->')
-        else:
-            # Убираем блок с фото
-            html = html.replace('{{#if photo}}', '<!--')
-            html = html.replace('{{else}}', '')
-            html = html.replace('{{/if}}', '-->')
-            html = html.replace('{{photo}}', '')
-    else:
-        html = html.replace('{{#if photo}}', '<!--')
-        html = html.replace('{{else}}', '')
-        html = html.replace('{{/if}}', '-->')
-        html = html.replace('{{photo}}', '')
-    
-    # Подстановка личной информации
-    if personal_info:
-        html = html.replace('{{full_name}}', personal_info.full_name or '')
-        html = html.replace('{{email}}', personal_info.email or '')
-        html = html.replace('{{phone}}', personal_info.phone or '')
-        html = html.replace('{{address}}', personal_info.address or '')
-        html = html.replace('{{linkedin}}', personal_info.linkedin or '')
-        html = html.replace('{{website}}', personal_info.website or '')
-        html = html.replace('{{summary}}', personal_info.summary or '')
-    else:
-        html = html.replace('{{full_name}}', 'Ваше Имя')
-        html = html.replace('{{email}}', 'email@example.com')
-        html = html.replace('{{phone}}', '+X XXX XXX XXXX')
-        html = html.replace('{{address}}', '')
-        html = html.replace('{{linkedin}}', '')
-        html = html.replace('{{website}}', '')
-        html = html.replace('{{summary}}', '')
-    
-    # Подстановка опыта работы
+    try:
+        return get_photo_url(resume) or ''
+    except Exception as e:
+        logger.warning('Photo rendition for resume %s failed: %s', resume.pk, e)
+        return ''
+
+
+def _render_work_experience(resume):
+    """HTML блока опыта работы"""
     work_html = ''
-    for exp in work_experience:
+    for exp in resume.work_experience.all():
         end_date = 'настоящее время' if exp.is_current else format_date_for_export(exp.end_date)
         work_html += f'''
         <div class="experience-item">
@@ -89,11 +43,13 @@ def generate_html_from_template(resume):
             {f'<div class="experience-description">{exp.description}</div>' if exp.description else ''}
         </div>
         '''
-    html = html.replace('{{work_experience}}', work_html)
-    
-    # Подстановка образования
+    return work_html
+
+
+def _render_education(resume):
+    """HTML блока образования"""
     edu_html = ''
-    for edu in education:
+    for edu in resume.education.all():
         end_date = format_date_for_export(edu.end_date) if edu.end_date else 'настоящее время'
         edu_html += f'''
         <div class="education-item">
@@ -105,19 +61,23 @@ def generate_html_from_template(resume):
             {f'<div class="education-description">{edu.description}</div>' if edu.description else ''}
         </div>
         '''
-    html = html.replace('{{education}}', edu_html)
-    
-    # Подстановка навыков
+    return edu_html
+
+
+def _render_skills(resume):
+    """HTML блока навыков"""
     skills_html = '<ul style="list-style: none; padding: 0; margin: 0;">'
-    for skill in skills:
+    for skill in resume.skills.all():
         level_display = dict(skill.LEVEL_CHOICES).get(skill.level, skill.level)
         skills_html += f'<li style="margin-bottom: 0.3rem;">• {skill.name} ({level_display})</li>'
     skills_html += '</ul>'
-    html = html.replace('{{skills}}', skills_html)
-    
-    # Подстановка достижений
+    return skills_html
+
+
+def _render_achievements(resume):
+    """HTML блока достижений"""
     achievements_html = ''
-    for ach in achievements:
+    for ach in resume.achievements.all():
         date_str = f'<div class="date">{format_date_for_export(ach.date)}</div>' if ach.date else ''
         achievements_html += f'''
         <div class="reward-item">
@@ -126,126 +86,188 @@ def generate_html_from_template(resume):
             {f'<div class="description">{ach.description}</div>' if ach.description else ''}
         </div>
         '''
-    html = html.replace('{{achievements}}', achievements_html)
-    html = html.replace('{{rewards}}', achievements_html)
-    
-    # Подстановка языков
+    return achievements_html
+
+
+def _render_languages(resume):
+    """HTML блока языков"""
     languages_html = ''
-    for lang in languages:
+    for lang in resume.languages.all():
         level_display = dict(lang.PROFICIENCY_CHOICES).get(lang.proficiency_level, lang.proficiency_level)
         languages_html += f'<div style="margin-bottom: 0.3rem;">{lang.language} - {level_display}</div>'
-    html = html.replace('{{languages}}', languages_html)
-    
-    # ============= КОМПАКТНЫЙ CSS ДЛЯ ОДНОЙ СТРАНИЦЫ =============
-    pdf_css = f'''
-    {css}
-    
-    /* PDF настройки */
-    @page {{
-        size: A4;
-        margin: 0.5cm; /* Минимальные отступы */
-    }}
-    
-    body {{
-        margin: 0;
-        padding: 0;
-        width: 100%;
-        max-width: 210mm;
-        font-size: 9pt; /* Уменьшен шрифт */
-        line-height: 1.2; /* Компактная высота строк */
-    }}
-    
-    * {{
-        box-sizing: border-box;
-        page-break-inside: avoid;
-    }}
-    
-    /* Компактные заголовки */
-    h1 {{ 
-        font-size: 16pt; 
-        margin: 0 0 0.2em 0;
-        line-height: 1.1;
-    }}
-    
-    h2 {{ 
-        font-size: 12pt; 
-        margin: 0.3em 0 0.2em 0;
-        line-height: 1.1;
-    }}
-    
-    h3 {{ 
-        font-size: 10pt; 
-        margin: 0.2em 0;
-        line-height: 1.1;
-    }}
-    
-    /* Фото компактное */
-    img {{
-        max-width: 80px !important; /* Уменьшили с 150px */
-        max-height: 80px !important;
-        border-radius: 50%;
-        object-fit: cover;
-        page-break-inside: avoid;
-    }}
-    
-    /* Компактные секции */
-    .experience-item,
-    .education-item,
-    .reward-item {{
-        page-break-inside: avoid;
-        margin-bottom: 0.3em; /* Минимальный отступ */
-        padding: 0.2em 0;
-    }}
-    
-    .experience-header,
-    .education-header {{
-        margin-bottom: 0.1em;
-    }}
-    
-    .experience-description,
-    .education-description {{
-        margin-top: 0.1em;
-        font-size: 8pt; /* Еще меньше */
-        line-height: 1.2;
-    }}
-    
-    /* Убираем лишние отступы */
-    ul, ol {{
-        margin: 0.2em 0;
-        padding-left: 1.2em;
-    }}
-    
-    li {{
-        margin-bottom: 0.1em;
-    }}
-    
-    p {{
-        margin: 0.2em 0;
-    }}
+    return languages_html
+
+
+# Плейсхолдер секции -> функция, формирующая её HTML
+SECTION_RENDERERS = {
+    'work_experience': _render_work_experience,
+    'education': _render_education,
+    'skills': _render_skills,
+    'achievements': _render_achievements,
+    'rewards': _render_achievements,
+    'languages': _render_languages,
+}
+
+# Значения по умолчанию, если личная информация ещё не заполнена
+PERSONAL_INFO_DEFAULTS = {
+    'full_name': 'Ваше Имя',
+    'email': 'email@example.com',
+    'phone': '+X XXX XXX XXXX',
+}
+
+
+def build_placeholder_values(resume, placeholders, photo_url=''):
+    """Значения только для тех плейсхолдеров, которые используются в шаблоне"""
+    personal_info = getattr(resume, 'personal_info', None)
+    rendered_sections = {}
+    values = {}
+
+    for name in placeholders:
+        if name == 'photo':
+            values[name] = photo_url
+        elif name in PERSONAL_INFO_PLACEHOLDERS:
+            if personal_info:
+                values[name] = getattr(personal_info, name) or ''
+            else:
+                values[name] = PERSONAL_INFO_DEFAULTS.get(name, '')
+        elif name in SECTION_RENDERERS:
+            renderer = SECTION_RENDERERS[name]
+            # {{achievements}} и {{rewards}} - один и тот же блок
+            if renderer not in rendered_sections:
+                rendered_sections[renderer] = renderer(resume)
+            values[name] = rendered_sections[renderer]
+    return values
+
+
+# ============= КОМПАКТНЫЙ CSS ДЛЯ ОДНОЙ СТРАНИЦЫ =============
+# Версия общих печатных стилей: увеличьте при изменении PRINT_CSS
+PRINT_CSS_VERSION = 1
+
+PRINT_CSS = '''
+/* PDF настройки */
+@page {
+    size: A4;
+    margin: 0.5cm; /* Минимальные отступы */
+}
+
+body {
+    margin: 0;
+    padding: 0;
+    width: 100%;
+    max-width: 210mm;
+    font-size: 9pt; /* Уменьшен шрифт */
+    line-height: 1.2; /* Компактная высота строк */
+}
+
+* {
+    box-sizing: border-box;
+    page-break-inside: avoid;
+}
+
+/* Компактные заголовки */
+h1 { 
+    font-size: 16pt; 
+    margin: 0 0 0.2em 0;
+    line-height: 1.1;
+}
+
+h2 { 
+    font-size: 12pt; 
+    margin: 0.3em 0 0.2em 0;
+    line-height: 1.1;
+}
+
+h3 { 
+    font-size: 10pt; 
+    margin: 0.2em 0;
+    line-height: 1.1;
+}
+
+/* Фото компактное */
+img {
+    max-width: 80px !important; /* Уменьшили с 150px */
+    max-height: 80px !important;
+    border-radius: 50%;
+    object-fit: cover;
+    page-break-inside: avoid;
+}
+
+/* Компактные секции */
+.experience-item,
+.education-item,
+.reward-item {
+    page-break-inside: avoid;
+    margin-bottom: 0.3em; /* Минимальный отступ */
+    padding: 0.2em 0;
+}
+
+.experience-header,
+.education-header {
+    margin-bottom: 0.1em;
+}
+
+.experience-description,
+.education-description {
+    margin-top: 0.1em;
+    font-size: 8pt; /* Еще меньше */
+    line-height: 1.2;
+}
+
+/* Убираем лишние отступы */
+ul, ol {
+    margin: 0.2em 0;
+    padding-left: 1.2em;
+}
+
+li {
+    margin-bottom: 0.1em;
+}
+
+p {
+    margin: 0.2em 0;
+}
+
+/* Компактный контейнер */
+.pdf-container {
+    width: 100%;
+    max-width: 100%;
+    padding: 0;
+    margin: 0;
+}
+
+/* Убираем разрывы страниц */
+div, section, article {
+    page-break-inside: avoid;
+}
+'''
+
+
+def generate_html_from_template(resume, inline_css=True):
+    """
+    Генерирует HTML с подстановкой данных резюме в шаблон.
+    Шаблон компилируется один раз (см. template_compiler), подстановка - за один проход
+    """
+    template = resume.template
+    compiled = get_compiled_template(template)
     
-    /* Компактный контейнер */
-    .pdf-container {{
-        width: 100%;
-        max-width: 100%;
-        padding: 0;
-        margin: 0;
-    }}
+    photo_url = ''
+    if resume.photo and ('photo' in compiled.placeholders or 'photo' in compiled.conditions):
+        photo_url = _photo_url(resume)
     
-    /* Убираем разрывы страниц */
-    div, section, article {{
-        page-break-inside: avoid;
-    }}
-    '''
+    values = build_placeholder_values(resume, compiled.placeholders, photo_url)
+    html = compiled.render(values, conditions={'photo'} if photo_url else ())
     
     # Оборачиваем в полный HTML
+    # Для PDF стили передаются в WeasyPrint отдельно (см. get_print_stylesheet)
+    style = f'''
+        <style>
+            {build_print_css(template)}
+        </style>''' if inline_css else ''
     full_html = f'''
     <!DOCTYPE html>
     <html>
     <head>
-        <meta charset="UTF-8">
-        <style>
-            {pdf_css}
-        </style>
+        <meta charset="UTF-8">{style}
     </head>
     <body>
         <div class="pdf-container">
@@ -258,6 +280,24 @@ def generate_html_from_template(resume):
     return full_html
 
 
+def build_print_css(template):
+    """Стили шаблона + компактные настройки печати для одной страницы"""
+    return f'''
+    {template.css_styles}
+    {PRINT_CSS}'''
+
+
+def get_print_stylesheet(template):
+    """
+    Ключ версии и текст печатного CSS шаблона.
+    По ключу процессы пула рендеринга кэшируют уже разобранный объект CSS
+    """
+    key = None
+    if template.pk is not None:
+        key = f'{template.pk}:{template.updated_at.isoformat()}:{PRINT_CSS_VERSION}'
+    return key, build_print_css(template)
+
+
 def format_date_for_export(date):
     """Форматирование даты для экспорта"""
     if not date:
@@ -271,13 +311,17 @@ def format_date_for_export(date):
         return str(date)
 
 
+@timed('export')
 def generate_pdf(resume):
     """Генерация PDF из резюме с учётом шаблона"""
     
+    stylesheet = None
+    
     # Проверяем, есть ли у резюме шаблон
     if resume.template and resume.template.html_structure:
-        # Используем HTML из шаблона
-        html_content = generate_html_from_template(resume)
+        # Используем HTML из шаблона, печатный CSS разбирается один раз в процессе пула
+        html_content = generate_html_from_template(resume, inline_css=False)
+        stylesheet = get_print_stylesheet(resume.template)
     else:
         # Используем дефолтный шаблон
         html_content = render_to_string('resume/pdf_template.html', {
@@ -290,14 +334,17 @@ def generate_pdf(resume):
             'languages': resume.languages.all(),
         })
     
-    # Генерируем PDF
-    pdf_file = BytesIO()
-    HTML(string=html_content).write_pdf(pdf_file)
-    pdf_file.seek(0)
+    # Генерируем PDF в прогретом процессе пула рендеринга
+    pdf_file = BytesIO(render_pdf(
+        html_content,
+        photo_root=get_renditions_config()['DIR'],
+        stylesheet=stylesheet
+    ))
     
     return pdf_file
 
 
+@timed('export')
 def generate_docx(resume):
 
     """Генерация DOCX из резюме"""
@@ -433,4 +480,36 @@ def generate_docx(resume):
     doc.save(docx_file)
     docx_file.seek(0)
     
-    return docx_file
\ No newline at end of file
+    return docx_file
+
+EXPORT_GENERATORS = {
+    'pdf': generate_pdf,
+    'docx': generate_docx,
+}
+
+EXPORT_CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+def export_filename(resume_id, title, export_format):
+    """Безопасное имя файла экспорта для архивов и выгрузки в каталог"""
+    safe_title = re.sub(r'[^\w\-. ]+', '', title).strip().replace(' ', '_') or 'resume'
+    return f'{resume_id}_{safe_title}.{export_format}'
+
+
+def export_resume(resume, export_format):
+    """
+    Получить файл экспорта резюме с использованием дискового кэша.
+    Возвращает кортеж (байты файла, было ли попадание в кэш)
+    """
+    cache = get_export_cache()
+    key = build_cache_key(resume, export_format)
+    content = cache.get(key, export_format)
+    if content is not None:
+        return content, True
+
+    content = EXPORT_GENERATORS[export_format](resume).read()
+    cache.set(key, export_format, content)
+    return content, False
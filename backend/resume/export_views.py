@@ -2,10 +2,14 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Resume
-from .export_utils import generate_pdf, generate_docx
+from .models import Resume, ExportJob
+from .export_utils import generate_docx, export_resume, EXPORT_CONTENT_TYPES
+from .export_jobs import enqueue_export
+from .loaders import load_resume_for_export
+from .export_archive import stream_resume_archive
+from .serializers import ExportJobSerializer
 import os
 
 
@@ -14,28 +18,22 @@ class ResumeExportPDFView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        resume = get_object_or_404(Resume, pk=pk, user=request.user)
-        
-        # Подгружаем связанные данные для оптимизации
-        resume = Resume.objects.select_related(
-            'template', 
-            'personal_info'
-        ).prefetch_related(
-            'education',
-            'work_experience',
-            'skills',
-            'achievements',
-            'languages'
-        ).get(pk=pk, user=request.user)
+        # Подгружаем только те секции, которые есть в шаблоне
+        try:
+            resume = load_resume_for_export('pdf', pk=pk, user=request.user)
+        except Resume.DoesNotExist:
+            raise Http404
         
         try:
-            pdf_file = generate_pdf(resume)
+            # Повторное скачивание без изменений отдаётся из кэша
+            pdf_content, cache_hit = export_resume(resume, 'pdf')
             
             # Формируем имя файла
             filename = f"{resume.title.replace(' ', '_')}.pdf"
             
-            response = HttpResponse(pdf_file.read(), content_type='application/pdf')
+            response = HttpResponse(pdf_content, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            response['X-Export-Cache'] = 'HIT' if cache_hit else 'MISS'
             return response
         
         except Exception as e:
@@ -48,7 +46,10 @@ class ResumeExportDOCXView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        resume = get_object_or_404(Resume, pk=pk, user=request.user)
+        try:
+            resume = load_resume_for_export('docx', pk=pk, user=request.user)
+        except Resume.DoesNotExist:
+            raise Http404
         
         try:
             docx_file = generate_docx(resume)
@@ -66,4 +67,105 @@ class ResumeExportDOCXView(APIView):
         except Exception as e:
             return Response({
                 'error': f'Ошибка при генерации DOCX: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ResumeExportJobCreateView(APIView):
+    """
+    Постановка экспорта в очередь.
+    Ожидает: {"format": "pdf" | "docx"}, возвращает id задачи для опроса статуса
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        resume = get_object_or_404(Resume, pk=pk, user=request.user)
+        export_format = request.data.get('format', 'pdf')
+
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response({
+                'error': 'Неподдерживаемый формат экспорта',
+                'detail': 'Доступны: ' + ', '.join(EXPORT_CONTENT_TYPES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_export(resume, export_format, request.user)
+
+        return Response({
+            'message': 'Экспорт поставлен в очередь',
+            'job_id': job.pk,
+            'job': ExportJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ResumeExportJobStatusView(APIView):
+    """Статус задачи экспорта"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, pk=job_id, user=request.user)
+        return Response(ExportJobSerializer(job).data)
+
+
+class ResumeExportJobDownloadView(APIView):
+    """Скачивание результата готовой задачи экспорта"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(
+            ExportJob.objects.select_related('resume'),
+            pk=job_id,
+            user=request.user
+        )
+
+        if job.status != ExportJob.STATUS_DONE or not job.file:
+            return Response({
+                'error': 'Файл ещё не готов',
+                'status': job.status,
+                'detail': job.error or None
+            }, status=status.HTTP_409_CONFLICT)
+
+        filename = f"{job.resume.title.replace(' ', '_')}.{job.export_format}"
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=filename,
+            content_type=EXPORT_CONTENT_TYPES[job.export_format]
+        )
+
+
+
+class ResumeExportArchiveView(APIView):
+    """
+    Экспорт всех резюме пользователя одним ZIP-архивом.
+    Query параметры:
+    - format: форматы через запятую (pdf, docx), по умолчанию pdf
+    """
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= здесь означает формат файлов, а не формат ответа DRF
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        formats = [
+            export_format.strip().lower()
+            for export_format in request.query_params.get('format', 'pdf').split(',')
+            if export_format.strip()
+        ]
+        unsupported = [export_format for export_format in formats if export_format not in EXPORT_CONTENT_TYPES]
+
+        if not formats or unsupported:
+            return Response({
+                'error': 'Неподдерживаемый формат экспорта',
+                'detail': 'Доступны: ' + ', '.join(EXPORT_CONTENT_TYPES),
+                'received': unsupported
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Убираем повторы, сохраняя порядок
+        formats = list(dict.fromkeys(formats))
+
+        response = StreamingHttpResponse(
+            stream_resume_archive(request.user, formats),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="resumes.zip"'
+        return response
@@ -0,0 +1,206 @@
+from operator import attrgetter
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils.encoding import force_str
+from django.utils.hashable import make_hashable
+from rest_framework import serializers
+from rest_framework.fields import SerializerMethodField, SkipField
+from rest_framework.relations import PKOnlyObject
+from resumebuilder.timing import timed
+from .serializers import ResumeListSerializer, ResumeDetailSerializer
+
+
+def _get_model_field(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _model_accessor(model, source_attrs):
+    """
+    Прямое чтение значения для полей модели и get_FOO_display.
+    DRF на каждое значение проверяет через inspect.signature, не является ли
+    атрибут вызываемым; для известных полей модели это решается заранее
+    """
+    if model is None or len(source_attrs) != 1:
+        return None
+    name = source_attrs[0]
+
+    model_field = _get_model_field(model, name)
+    if model_field is not None and model_field.concrete and not model_field.is_relation:
+        return attrgetter(model_field.attname)
+
+    if name.startswith('get_') and name.endswith('_display'):
+        model_field = _get_model_field(model, name[4:-8])
+        if model_field is None or not model_field.choices:
+            return None
+        # То же, что Model._get_FIELD_display, но словарь вариантов строится один раз
+        choices = dict(make_hashable(model_field.flatchoices))
+        attname = model_field.attname
+
+        def get_display(instance):
+            value = getattr(instance, attname)
+            return force_str(choices.get(make_hashable(value), value), strings_only=True)
+        return get_display
+    return None
+
+
+def _field_step(field, model):
+    """Чтение и преобразование обычного поля, как в Serializer.to_representation"""
+    to_representation = field.to_representation
+    accessor = _model_accessor(model, field.source_attrs)
+
+    if accessor is not None:
+        def fast_step(instance, request):
+            value = accessor(instance)
+            return None if value is None else to_representation(value)
+        return fast_step
+
+    get_attribute = field.get_attribute
+
+    def step(instance, request):
+        value = get_attribute(instance)
+        return None if value is None else to_representation(value)
+    return step
+
+
+def _pk_step(field):
+    """Первичный ключ связанного объекта без загрузки самого объекта"""
+    source_attrs = field.source_attrs
+    to_representation = field.to_representation
+
+    def step(instance, request):
+        attribute = field.get_attribute(instance)
+        if attribute is None or (isinstance(attribute, PKOnlyObject) and attribute.pk is None):
+            return None
+        return to_representation(attribute)
+
+    if len(source_attrs) != 1:
+        return step
+
+    def fast_step(instance, request):
+        pk = instance.serializable_value(source_attrs[0])
+        return None if pk is None else to_representation(PKOnlyObject(pk=pk))
+    return fast_step
+
+
+def _file_step(field):
+    """Ссылка на файл; с запросом - абсолютная, как у FileField с request в контексте"""
+    attr = field.source_attrs[0]
+    use_url = getattr(field, 'use_url', True)
+
+    def step(instance, request):
+        value = getattr(instance, attr)
+        if not value:
+            return None
+        if not use_url:
+            return value.name
+        try:
+            url = value.url
+        except AttributeError:
+            return None
+        return request.build_absolute_uri(url) if request is not None else url
+    return step
+
+
+def _method_step(serializer, field):
+    method = getattr(serializer, field.method_name)
+
+    def step(instance, request):
+        return method(instance)
+    return step
+
+
+def _nested_step(field):
+    get_attribute = field.get_attribute
+    child = compile_serializer(field)
+
+    def step(instance, request):
+        value = get_attribute(instance)
+        return None if value is None else child(value, request)
+    return step
+
+
+def _many_step(field):
+    get_attribute = field.get_attribute
+    child = compile_serializer(field.child)
+
+    def step(instance, request):
+        value = get_attribute(instance)
+        if value is None:
+            return None
+        items = value.all() if isinstance(value, models.manager.BaseManager) else value
+        return [child(item, request) for item in items]
+    return step
+
+
+def compile_serializer(serializer):
+    """
+    Функция (instance, request) -> dict с тем же результатом, что serializer.data.
+    Поля сериализатора разбираются один раз; при вызове не создаются экземпляры
+    сериализаторов и не копируются поля, как это делает DRF для каждого объекта
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    steps = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, SerializerMethodField):
+            step = _method_step(serializer, field)
+        elif isinstance(field, serializers.ListSerializer):
+            step = _many_step(field)
+        elif isinstance(field, serializers.BaseSerializer):
+            step = _nested_step(field)
+        elif isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization():
+            step = _pk_step(field)
+        elif isinstance(field, serializers.FileField):
+            step = _file_step(field)
+        else:
+            step = _field_step(field, model)
+        steps.append((name, step))
+
+    def serialize(instance, request=None):
+        data = {}
+        for name, step in steps:
+            try:
+                data[name] = step(instance, request)
+            except SkipField:
+                # DRF пропускает необязательное поле, если его источник недоступен
+                # (например, template.name у резюме без шаблона)
+                pass
+        return data
+    return serialize
+
+
+class FastSerializer:
+    """
+    Сериализатор только для чтения на основе обычного DRF сериализатора.
+    Форма JSON полностью совпадает с исходным сериализатором, включая
+    *_display поля и SerializerMethodField, но план сериализации
+    собирается один раз при первом использовании
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._serialize = None
+
+    def _get_serialize(self):
+        if self._serialize is None:
+            self._serialize = compile_serializer(self.serializer_class())
+        return self._serialize
+
+    @timed('serialize')
+    def to_representation(self, instance, request=None):
+        """Данные одного объекта; с request ссылки на файлы абсолютные"""
+        return self._get_serialize()(instance, request)
+
+    @timed('serialize')
+    def many(self, instances, request=None):
+        """Данные списка объектов"""
+        serialize = self._get_serialize()
+        return [serialize(instance, request) for instance in instances]
+
+
+resume_list_serializer = FastSerializer(ResumeListSerializer)
+resume_detail_serializer = FastSerializer(ResumeDetailSerializer)
@@ -0,0 +1,166 @@
+import json
+from django.db import connections, router
+from django.db.models import prefetch_related_objects
+from django.db.models.expressions import RawSQL
+from .models import Resume
+from .template_compiler import get_compiled_template
+
+
+# Все секции резюме (related_name у дочерних моделей)
+SECTION_RELATIONS = ('education', 'work_experience', 'skills', 'achievements', 'languages')
+
+# Плейсхолдер шаблона -> секция, из которой берутся данные
+PLACEHOLDER_RELATIONS = {
+    'education': 'education',
+    'work_experience': 'work_experience',
+    'skills': 'skills',
+    'achievements': 'achievements',
+    'rewards': 'achievements',
+    'languages': 'languages',
+}
+
+
+def get_render_relations(template, export_format='pdf'):
+    """
+    Секции, которые реально нужны для экспорта.
+    PDF по HTML шаблону использует только секции с плейсхолдерами в шаблоне,
+    DOCX и PDF без шаблона выводят все секции.
+    """
+    if export_format != 'pdf' or not template or not template.html_structure:
+        return SECTION_RELATIONS
+    placeholders = get_compiled_template(template).placeholders
+    return tuple(
+        relation for relation in SECTION_RELATIONS
+        if any(PLACEHOLDER_RELATIONS.get(name) == relation for name in placeholders)
+    )
+
+
+def supports_json_loading(using=None):
+    """Загрузка резюме одним запросом доступна только на PostgreSQL"""
+    using = using or router.db_for_read(Resume)
+    return connections[using].vendor == 'postgresql'
+
+
+def _order_by_sql(model, alias, quote_name):
+    """ORDER BY по Meta.ordering модели секции - тот же порядок, что и у prefetch"""
+    clauses = []
+    for name in model._meta.ordering:
+        descending = name.startswith('-')
+        column = model._meta.get_field(name.lstrip('-')).column
+        clauses.append(f'{alias}.{quote_name(column)}{" DESC" if descending else ""}')
+    return ', '.join(clauses)
+
+
+def _json_annotations(using, relations):
+    """
+    Подзапросы с личной информацией и секциями relations в виде JSON.
+    Все данные резюме приходят в одной строке результата
+    """
+    quote_name = connections[using].ops.quote_name
+    resume_pk = f'{quote_name(Resume._meta.db_table)}.{quote_name(Resume._meta.pk.column)}'
+
+    personal_info = Resume._meta.get_field('personal_info').related_model
+    annotations = {
+        '_personal_info_json': RawSQL(
+            f'SELECT row_to_json(t) FROM {quote_name(personal_info._meta.db_table)} t '
+            f'WHERE t.resume_id = {resume_pk}',
+            ()
+        ),
+    }
+    for relation in relations:
+        model = Resume._meta.get_field(relation).related_model
+        order_by = _order_by_sql(model, 't', quote_name)
+        annotations[f'_{relation}_json'] = RawSQL(
+            f"SELECT COALESCE(json_agg(t ORDER BY {order_by}), '[]'::json) "
+            f'FROM {quote_name(model._meta.db_table)} t WHERE t.resume_id = {resume_pk}',
+            ()
+        )
+    return annotations
+
+
+def _from_json(model, row, using):
+    """Экземпляр модели из строки row_to_json"""
+    fields = model._meta.concrete_fields
+    return model.from_db(
+        using,
+        [field.attname for field in fields],
+        [field.to_python(row.get(field.column)) for field in fields]
+    )
+
+
+def _attach_json_relations(resume, using, relations):
+    """Разложить JSON из подзапросов в кэши связей, как это делает prefetch_related"""
+    personal_info_rel = Resume._meta.get_field('personal_info')
+    row = resume._personal_info_json
+    if isinstance(row, str):
+        row = json.loads(row)
+    personal_info = _from_json(personal_info_rel.related_model, row, using) if row else None
+    personal_info_rel.set_cached_value(resume, personal_info)
+    if personal_info is not None:
+        personal_info_rel.remote_field.set_cached_value(personal_info, resume)
+    del resume._personal_info_json
+
+    for relation in relations:
+        rows = getattr(resume, f'_{relation}_json')
+        if isinstance(rows, str):
+            rows = json.loads(rows)
+        rel = Resume._meta.get_field(relation)
+        items = [_from_json(rel.related_model, item, using) for item in rows]
+        for item in items:
+            rel.remote_field.set_cached_value(item, resume)
+
+        queryset = getattr(resume, relation).all()
+        queryset._result_cache = items
+        queryset._prefetch_done = True
+        resume._prefetched_objects_cache[relation] = queryset
+        delattr(resume, f'_{relation}_json')
+    return resume
+
+
+def load_resume(relations=SECTION_RELATIONS, **lookup):
+    """
+    Резюме с шаблоном, личной информацией и секциями.
+    PostgreSQL: один запрос, секции relations собираются json_agg в подзапросах.
+    Другие СУБД: JOIN шаблона и личной информации + prefetch секций relations.
+    Остальные секции, как и без prefetch, загружаются при обращении
+    """
+    using = router.db_for_read(Resume)
+    if not supports_json_loading(using):
+        resume = Resume.objects.select_related('template', 'personal_info').get(**lookup)
+        if relations:
+            prefetch_related_objects([resume], *relations)
+        return resume
+
+    resume = Resume.objects.select_related('template').annotate(
+        **_json_annotations(using, relations)
+    ).get(**lookup)
+    resume._prefetched_objects_cache = {}
+    return _attach_json_relations(resume, using, relations)
+
+
+def load_resume_for_export(export_format='pdf', **lookup):
+    """
+    Загрузить резюме для экспорта.
+    На PostgreSQL всё резюме приходит одним запросом (см. load_resume): сетевые
+    задержки дороже, чем лишние секции в ответе. На других СУБД шаблон и личная
+    информация загружаются через JOIN, затем prefetch - только нужные шаблону секции
+    """
+    if supports_json_loading():
+        return load_resume(**lookup)
+
+    resume = Resume.objects.select_related('template', 'personal_info').get(**lookup)
+    relations = get_render_relations(resume.template, export_format)
+    if relations:
+        prefetch_related_objects([resume], *relations)
+    return resume
+
+
+def detail_queryset():
+    """Резюме со всем, что выводит ResumeDetailSerializer: JOIN + prefetch всех секций"""
+    return Resume.objects.select_related('template', 'personal_info').prefetch_related(*SECTION_RELATIONS)
+
+
+def prefetch_detail(resume):
+    """Догрузить связанные данные уже полученного резюме перед ResumeDetailSerializer"""
+    prefetch_related_objects([resume], 'template', 'personal_info', *SECTION_RELATIONS)
+    return resume
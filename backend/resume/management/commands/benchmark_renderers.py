@@ -0,0 +1,95 @@
+import io
+import timeit
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from resumebuilder.parsers import ORJSONParser
+from resumebuilder.renderers import ORJSONRenderer
+from resume.loaders import load_resume
+from resume.sample_data import create_sample_resume
+from resume.fast_serializers import resume_detail_serializer
+from template.models import Template
+from template.serializers import TemplateListSerializer
+
+
+class Command(BaseCommand):
+    """
+    Пропускная способность JSONRenderer/JSONParser DRF и их версий на orjson
+    на данных детального резюме и списка шаблонов.
+    Данные создаются в транзакции и откатываются
+    """
+    help = 'Микробенчмарк JSON рендеринга и разбора ответов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            default='5,50,200',
+            help='Количество элементов в каждой секции резюме через запятую'
+        )
+        parser.add_argument(
+            '--templates',
+            type=int,
+            default=100,
+            help='Количество шаблонов в списке'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов замера (берётся лучший)'
+        )
+
+    def measure(self, func, number, repeat):
+        return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+    def compare(self, label, data, repeat):
+        json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        content = json_renderer.render(data)
+        if orjson_renderer.render(data) != content:
+            raise CommandError(f'Ответы рендереров различаются: {label}')
+        if ORJSONParser().parse(io.BytesIO(content)) != JSONParser().parse(io.BytesIO(content)):
+            raise CommandError(f'Результаты разбора различаются: {label}')
+
+        number = max(1, 2_000_000 // len(content))
+        timings = [
+            self.measure(lambda: json_renderer.render(data), number, repeat),
+            self.measure(lambda: orjson_renderer.render(data), number, repeat),
+            self.measure(lambda: JSONParser().parse(io.BytesIO(content)), number, repeat),
+            self.measure(lambda: ORJSONParser().parse(io.BytesIO(content)), number, repeat),
+        ]
+        size_mb = len(content) / 1024 / 1024
+        self.stdout.write(
+            f'{label:>18} {len(content) / 1024:>8.1f} ' +
+            ' '.join(f'{size_mb / timing:>10.1f}' for timing in timings) +
+            f' {timings[0] / timings[1]:>8.1f}x {timings[2] / timings[3]:>8.1f}x'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Пропускная способность, МБ/с')
+        self.stdout.write(
+            f'{"Данные":>18} {"КБ":>8} {"json":>10} {"orjson":>10} {"json-р":>10} {"orjson-р":>10}'
+            f' {"рендер":>9} {"разбор":>9}'
+        )
+        with transaction.atomic():
+            for items in (int(value) for value in options['items'].split(',')):
+                resume = load_resume(pk=create_sample_resume(items).pk)
+                self.compare(
+                    f'резюме, {items}', resume_detail_serializer.to_representation(resume), options['repeat']
+                )
+
+            owner = resume.user
+            Template.objects.bulk_create(
+                Template(
+                    name=f'Шаблон {i}', description='Описание шаблона. ' * 5,
+                    html_structure='<div></div>', css_styles='', created_by=owner
+                ) for i in range(options['templates'])
+            )
+            templates = Template.objects.select_related('created_by')[:options['templates']]
+            self.compare(
+                f'шаблоны, {options["templates"]}',
+                TemplateListSerializer(templates, many=True).data,
+                options['repeat']
+            )
+
+            transaction.set_rollback(True)
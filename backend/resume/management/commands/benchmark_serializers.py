@@ -0,0 +1,68 @@
+import timeit
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from resume.models import Resume
+from resume.loaders import load_resume
+from resume.sample_data import create_sample_resume
+from resume.serializers import ResumeDetailSerializer, ResumeListSerializer
+from resume.fast_serializers import resume_detail_serializer, resume_list_serializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнение DRF сериализаторов резюме и скомпилированных сериализаторов
+    на резюме разного размера. Данные создаются в транзакции и откатываются
+    """
+    help = 'Микробенчмарк сериализации резюме'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            default='5,50,200',
+            help='Количество элементов в каждой секции через запятую'
+        )
+        parser.add_argument(
+            '--list-size',
+            type=int,
+            default=100,
+            help='Количество резюме на странице списка'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов замера (берётся лучший)'
+        )
+
+    def measure(self, func, number, repeat):
+        return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+    def report(self, label, drf, fast):
+        self.stdout.write(f'{label:>16} {drf * 1000:>12.3f} {fast * 1000:>12.3f} {drf / fast:>9.1f}x')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"Резюме":>16} {"DRF, мс":>12} {"быстрый, мс":>12} {"ускорение":>10}')
+        with transaction.atomic():
+            for items in (int(value) for value in options['items'].split(',')):
+                resume = load_resume(pk=create_sample_resume(items).pk)
+
+                if dict(ResumeDetailSerializer(resume).data) != resume_detail_serializer.to_representation(resume):
+                    raise CommandError(f'Результаты сериализаторов различаются ({items} элементов)')
+
+                number = max(1, 500 // items)
+                drf = self.measure(lambda: ResumeDetailSerializer(resume).data, number, options['repeat'])
+                fast = self.measure(
+                    lambda: resume_detail_serializer.to_representation(resume), number, options['repeat']
+                )
+                self.report(f'детально, {items}', drf, fast)
+
+            created = [create_sample_resume(1).pk for _ in range(options['list_size'])]
+            page = list(Resume.objects.filter(pk__in=created).select_related('template', 'personal_info'))
+            drf_page = [dict(item) for item in ResumeListSerializer(page, many=True).data]
+            if drf_page != resume_list_serializer.many(page):
+                raise CommandError('Результаты сериализаторов списка различаются')
+            drf = self.measure(lambda: ResumeListSerializer(page, many=True).data, 20, options['repeat'])
+            fast = self.measure(lambda: resume_list_serializer.many(page), 20, options['repeat'])
+            self.report(f'список, {len(page)}', drf, fast)
+
+            transaction.set_rollback(True)
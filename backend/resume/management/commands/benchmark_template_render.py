@@ -0,0 +1,80 @@
+import timeit
+from django.core.management.base import BaseCommand
+from resume.template_compiler import compile_template_source, KNOWN_PLACEHOLDERS
+
+
+# Фрагмент шаблона со всеми плейсхолдерами, из которого собирается большой шаблон
+TEMPLATE_BLOCK = '''
+<div class="resume-header">
+    {{#if photo}}<img src="{{photo}}" class="photo">{{else}}<div class="no-photo"></div>{{/if}}
+    <h1>{{full_name}}</h1>
+    <div class="contacts">{{email}} | {{phone}} | {{address}} | {{linkedin}} | {{website}}</div>
+</div>
+<section><h2>О себе</h2><p>{{summary}}</p></section>
+<section><h2>Опыт работы</h2>{{work_experience}}</section>
+<section><h2>Образование</h2>{{education}}</section>
+<section><h2>Навыки</h2>{{skills}}</section>
+<section><h2>Достижения</h2>{{achievements}}{{rewards}}</section>
+<section><h2>Языки</h2>{{languages}}</section>
+<div class="filler">''' + 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 20 + '''</div>
+'''
+
+
+def legacy_fill(html, values, has_photo):
+    """Прежняя цепочка str.replace из generate_html_from_template"""
+    if has_photo:
+        html = html.replace('{{photo}}', values['photo'])
+        html = html.replace('{{#if photo}}', '')
+        html = html.replace('{{else}}', '<!--')
+        html = html.replace('{{/if}}', '-->')
+    else:
+        html = html.replace('{{#if photo}}', '<!--')
+        html = html.replace('{{else}}', '')
+        html = html.replace('{{/if}}', '-->')
+        html = html.replace('{{photo}}', '')
+    for name in ('full_name', 'email', 'phone', 'address', 'linkedin', 'website', 'summary',
+                 'work_experience', 'education', 'skills', 'achievements', 'rewards', 'languages'):
+        html = html.replace('{{' + name + '}}', values[name])
+    return html
+
+
+class Command(BaseCommand):
+    """Сравнение цепочки str.replace и скомпилированного плана рендеринга"""
+    help = 'Микробенчмарк подстановки данных в HTML шаблоны резюме'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10,100,500',
+            help='Размеры шаблонов в КБ через запятую'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов замера (берётся лучший)'
+        )
+
+    def handle(self, *args, **options):
+        values = {name: f'<b>{name}</b> ' * 10 for name in KNOWN_PLACEHOLDERS}
+        values['photo'] = 'data:image/jpeg;base64,' + 'A' * 40_000
+
+        self.stdout.write(f'{"Размер":>10} {"replace, мс":>14} {"план, мс":>12} {"ускорение":>10}')
+        for size_kb in (int(size) for size in options['sizes'].split(',')):
+            copies = max(1, size_kb * 1024 // len(TEMPLATE_BLOCK.encode('utf-8')))
+            source = TEMPLATE_BLOCK * copies
+            compiled = compile_template_source(source)
+
+            number = max(1, 2000 // copies)
+            legacy = min(timeit.repeat(
+                lambda: legacy_fill(source, values, True),
+                number=number, repeat=options['repeat']
+            )) / number
+            planned = min(timeit.repeat(
+                lambda: compiled.render(values, conditions={'photo'}),
+                number=number, repeat=options['repeat']
+            )) / number
+
+            self.stdout.write(
+                f'{size_kb:>8}КБ {legacy * 1000:>14.3f} {planned * 1000:>12.3f} {legacy / planned:>9.1f}x'
+            )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from resume.export_jobs import fail_stale_jobs, delete_expired_jobs
+
+
+class Command(BaseCommand):
+    """
+    Обслуживание очереди экспорта: брошенные задачи (в работе дольше
+    EXPORT_JOBS['RUNNING_TIMEOUT']) завершаются с ошибкой, завершённые задачи
+    старше EXPORT_JOBS['RESULT_TTL'] удаляются вместе с файлами.
+    run_export_worker делает это сам; при BACKEND = 'thread' команду запускают по cron
+    """
+    help = 'Очистка брошенных и устаревших задач экспорта'
+
+    def handle(self, *args, **options):
+        stale, expired = fail_stale_jobs(), delete_expired_jobs()
+        self.stdout.write(f'Прервано брошенных задач: {stale}, удалено устаревших: {expired}')
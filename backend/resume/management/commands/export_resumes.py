@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import time
+from datetime import datetime, time as dt_time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from resume.models import Resume
+from resume.export_utils import EXPORT_CONTENT_TYPES
+from resume.bulk_export import init_worker, export_one
+
+
+class Command(BaseCommand):
+    """
+    Массовая перегенерация экспортов резюме, например после изменения шаблона.
+    Резюме читаются серверным курсором пачками, рендеринг идёт в пуле процессов,
+    обработанные id записываются в файл контрольной точки
+    """
+    help = 'Массовый экспорт резюме в PDF/DOCX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='ID или username пользователя')
+        parser.add_argument('--template', type=int, help='ID шаблона')
+        parser.add_argument(
+            '--updated-since',
+            help='Только резюме, изменённые начиная с даты (YYYY-MM-DD или ISO datetime)'
+        )
+        parser.add_argument(
+            '--format',
+            default='pdf',
+            help='Форматы через запятую: pdf, docx'
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Каталог для файлов. Без него файлы сохраняются в кэш экспорта'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки: уже обработанные резюме пропускаются'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Количество процессов рендеринга'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Размер пачки при чтении резюме из БД'
+        )
+
+    def handle(self, *args, **options):
+        formats = [f.strip().lower() for f in options['format'].split(',') if f.strip()]
+        unsupported = [f for f in formats if f not in EXPORT_CONTENT_TYPES]
+        if not formats or unsupported:
+            raise CommandError(f'Неподдерживаемый формат: {", ".join(unsupported)}. '
+                               f'Доступны: {", ".join(EXPORT_CONTENT_TYPES)}')
+
+        output_dir = options['output_dir']
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        queryset = self._build_queryset(options)
+        done = self._read_checkpoint(options['checkpoint'])
+        total = queryset.count()
+        self.stdout.write(
+            f'Резюме к экспорту: {total}, уже обработано по контрольной точке: {len(done)}'
+        )
+
+        # Серверный курсор (на PostgreSQL) - id читаются пачками, а не целиком
+        resume_ids = (
+            resume_id
+            for resume_id in queryset.values_list('pk', flat=True).iterator(chunk_size=options['chunk_size'])
+            if resume_id not in done
+        )
+        tasks = ((resume_id, formats, output_dir) for resume_id in resume_ids)
+
+        processed = len(done)
+        failed = 0
+        started = time.monotonic()
+        checkpoint_file = open(options['checkpoint'], 'a') if options['checkpoint'] else None
+
+        # Соединения родителя не должны попасть в дочерние процессы
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'resumebuilder.settings')
+
+        try:
+            with context.Pool(
+                processes=max(1, options['processes']),
+                initializer=init_worker,
+                initargs=(settings_module,),
+            ) as pool:
+                for resume_id, errors, elapsed in pool.imap_unordered(export_one, tasks, chunksize=1):
+                    processed += 1
+                    if errors:
+                        failed += 1
+                        self.stderr.write(f'[{processed}/{total}] #{resume_id}: ' + '; '.join(errors))
+                    else:
+                        self.stdout.write(f'[{processed}/{total}] #{resume_id} ({elapsed:.2f}с)')
+                        if checkpoint_file:
+                            checkpoint_file.write(f'{resume_id}\n')
+                            checkpoint_file.flush()
+        finally:
+            if checkpoint_file:
+                checkpoint_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {processed - failed} успешно, {failed} с ошибками, '
+            f'{time.monotonic() - started:.1f}с'
+        ))
+
+    def _build_queryset(self, options):
+        queryset = Resume.objects.order_by('pk')
+
+        if options['user']:
+            user = options['user']
+            queryset = queryset.filter(user_id=int(user)) if user.isdigit() else queryset.filter(user__username=user)
+
+        if options['template']:
+            queryset = queryset.filter(template_id=options['template'])
+
+        if options['updated_since']:
+            since = parse_datetime(options['updated_since'])
+            if since is None:
+                since_date = parse_date(options['updated_since'])
+                if since_date is None:
+                    raise CommandError('Неверный формат --updated-since, ожидается YYYY-MM-DD')
+                since = datetime.combine(since_date, dt_time.min)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gte=since)
+
+        return queryset
+
+    def _read_checkpoint(self, path):
+        """Id резюме, успешно обработанных в прошлых запусках"""
+        if not path or not os.path.exists(path):
+            return set()
+        with open(path) as checkpoint_file:
+            return {int(line) for line in checkpoint_file if line.strip().isdigit()}
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from resume.models import Resume, SECTION_COUNT_FIELDS
+
+
+def actual_counts():
+    """Аннотации с фактическим количеством элементов секций (подзапросы, без JOIN)"""
+    annotations = {}
+    for relation, field in SECTION_COUNT_FIELDS.items():
+        section_model = Resume._meta.get_field(relation).related_model
+        items = section_model.objects.filter(
+            resume=OuterRef('pk')
+        ).order_by().values('resume').annotate(total=Count('pk')).values('total')
+        annotations[f'actual_{field}'] = Coalesce(Subquery(items, output_field=IntegerField()), 0)
+    return annotations
+
+
+class Command(BaseCommand):
+    """
+    Пересчёт денормализованных счётчиков секций в Resume.
+    Обычно счётчики поддерживаются сигналами; команда нужна после
+    массовых изменений в обход ORM или для проверки расхождений
+    """
+    help = 'Пересчёт счётчиков секций резюме'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Размер пачки при сохранении исправлений'
+        )
+
+    def handle(self, *args, **options):
+        fields = list(SECTION_COUNT_FIELDS.values())
+        mismatch = Q()
+        for field in fields:
+            mismatch |= ~Q(**{field: F(f'actual_{field}')})
+        # Из БД читаются только строки с расхождениями
+        queryset = Resume.objects.annotate(**actual_counts()).filter(mismatch).only('pk', *fields)
+
+        fixed = []
+        for resume in queryset.iterator(chunk_size=options['batch_size']):
+            for field in fields:
+                setattr(resume, field, getattr(resume, f'actual_{field}'))
+            fixed.append(resume)
+            if options['dry_run']:
+                self.stdout.write(f'#{resume.pk}: ' + ', '.join(
+                    f'{field}={getattr(resume, field)}' for field in fields
+                ))
+
+        if not options['dry_run'] and fixed:
+            # bulk_update не вызывает save(): ревизия и updated_at не меняются
+            Resume.objects.bulk_update(fixed, fields, batch_size=options['batch_size'])
+
+        action = 'Найдено расхождений' if options['dry_run'] else 'Исправлено резюме'
+        self.stdout.write(self.style.SUCCESS(f'{action}: {len(fixed)}'))
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from resume.export_jobs import (
+    claim_next_job, run_job, get_jobs_config, fail_stale_jobs, delete_expired_jobs
+)
+from resume.thumbnails import refresh_stale_thumbnails
+
+
+class Command(BaseCommand):
+    """
+    Воркер очереди экспорта: забирает задачи из таблицы ExportJob
+    (DB-брокер, EXPORT_JOBS['BACKEND'] = 'db') и выполняет их.
+    Когда очередь пуста, перерисовывает устаревшие превью резюме
+    (после изменения вёрстки шаблона). С BACKEND = 'thread' превью перерисовывает
+    веб-процесс, а команду с --once можно запускать по расписанию для повтора неудачных
+    """
+    help = 'Обработка фоновых задач экспорта резюме'
+
+    # Как часто (сек) при пустой очереди проверяются брошенные и устаревшие задачи
+    maintenance_interval = 300
+    # Сколько превью перерисовывается между проверками очереди экспорта
+    thumbnails_batch = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=get_jobs_config()['WORKERS'],
+            help='Количество параллельных задач'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза между опросами пустой очереди (сек)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать текущую очередь и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f'Воркер экспорта запущен, потоков: {workers}')
+
+        self._maintenance()
+        last_maintenance = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                futures = [executor.submit(self._process_one) for _ in range(workers)]
+                processed = sum(1 for future in futures if future.result())
+
+                if not processed and self._thumbnail_cursor is not None:
+                    # Превью - после задач пользователей, небольшими партиями
+                    self._thumbnail_cursor = refresh_stale_thumbnails(self.thumbnails_batch, self._thumbnail_cursor)
+                    processed = self._thumbnail_cursor is not None
+
+                if not processed:
+                    if options['once']:
+                        break
+                    if time.monotonic() - last_maintenance > self.maintenance_interval:
+                        self._maintenance()
+                        last_maintenance = time.monotonic()
+                    time.sleep(options['poll_interval'])
+
+    def _maintenance(self):
+        """
+        Брошенные задачи - в ошибку, завершённые старше RESULT_TTL - удалить вместе с файлами,
+        устаревшие превью - перерисовать
+        """
+        close_old_connections()
+        stale, expired = fail_stale_jobs(), delete_expired_jobs()
+        # Проход по устаревшим превью начинается заново; неудачные повторяются здесь
+        self._thumbnail_cursor = 0
+        if stale or expired:
+            self.stdout.write(f'Прервано брошенных задач: {stale}, удалено устаревших: {expired}')
+
+    def _process_one(self):
+        close_old_connections()
+        try:
+            job = claim_next_job()
+            if job is None:
+                return False
+            job = run_job(job)
+            self.stdout.write(f'{job.pk} [{job.export_format}]: {job.get_status_display()}')
+            return True
+        finally:
+            close_old_connections()
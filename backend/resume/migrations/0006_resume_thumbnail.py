@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0005_exportjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="thumbnail",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                upload_to="resumes/thumbnails/",
+                verbose_name="Превью",
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="thumbnail_key",
+            field=models.CharField(
+                blank=True, max_length=64, verbose_name="Ключ содержимого превью"
+            ),
+        ),
+    ]
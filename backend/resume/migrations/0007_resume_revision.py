@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0006_resume_thumbnail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="revision",
+            field=models.PositiveIntegerField(default=0, verbose_name="Ревизия"),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:28
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+SECTIONS = (
+    ("education", "Education", "education_count"),
+    ("workexperlence", "WorkExperience", "work_experience_count"),
+    ("skill", "Skill", "skills_count"),
+    ("achievement", "Achievement", "achievements_count"),
+    ("language", "Language", "languages_count"),
+)
+
+
+def fill_section_counters(apps, schema_editor):
+    Resume = apps.get_model("resume", "Resume")
+    for app_label, model_name, field in SECTIONS:
+        section_model = apps.get_model(app_label, model_name)
+        items = (
+            section_model.objects.filter(resume=OuterRef("pk"))
+            .order_by()
+            .values("resume")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        Resume.objects.update(
+            **{field: Coalesce(Subquery(items, output_field=IntegerField()), 0)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0007_resume_revision"),
+        ("education", "0002_initial"),
+        ("workexperlence", "0001_initial"),
+        ("skill", "0001_initial"),
+        ("achievement", "0002_initial"),
+        ("language", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="achievements_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество достижений"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="education_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество записей об образовании"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="languages_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество языков"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="skills_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество навыков"
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="work_experience_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Количество мест работы"
+            ),
+        ),
+        migrations.RunPython(fill_section_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:30
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0008_resume_section_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumeSnapshot",
+            fields=[
+                (
+                    "resume",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="snapshot",
+                        serialize=False,
+                        to="resume.resume",
+                        verbose_name="Резюме",
+                    ),
+                ),
+                ("key", models.CharField(max_length=100, verbose_name="Версия данных")),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Данные",
+                    ),
+                ),
+                (
+                    "built_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата сборки"),
+                ),
+            ],
+            options={
+                "verbose_name": "Снимок резюме",
+                "verbose_name_plural": "Снимки резюме",
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0009_resumesnapshot"),
+        ("template", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resume",
+            index=models.Index(
+                fields=["user", "-updated_at", "-id"], name="resume_user_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resume",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="resume_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume", "0010_resume_list_indexes"),
+        ("template", "0003_template_active_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resume",
+            index=models.Index(
+                condition=models.Q(("is_primary", True)),
+                fields=["user"],
+                name="resume_user_primary_idx",
+            ),
+        ),
+    ]
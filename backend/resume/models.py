@@ -1,5 +1,25 @@
+import uuid
 from django.db import models
+from django.db.models import F, Q
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+
+# Поля резюме, изменение которых не создаёт новую ревизию
+NON_REVISION_FIELDS = {'views_count', 'thumbnail', 'thumbnail_key'}
+
+# Секция резюме (related_name) -> поле со счётчиком её элементов
+SECTION_COUNT_FIELDS = {
+    'education': 'education_count',
+    'work_experience': 'work_experience_count',
+    'skills': 'skills_count',
+    'achievements': 'achievements_count',
+    'languages': 'languages_count',
+}
+
+# Всего секций для процента заполнения: личная информация + секции со счётчиками
+TOTAL_SECTIONS = 1 + len(SECTION_COUNT_FIELDS)
 
 
 class Resume(models.Model):
@@ -37,7 +57,50 @@ class Resume(models.Model):
         default=0,
         verbose_name='Количество просмотров'
     )
-    
+
+    # Номер ревизии: увеличивается при каждом изменении резюме, личной информации
+    # или секций. Пара (id, revision) однозначно определяет содержимое резюме
+    revision = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ревизия'
+    )
+
+    # Количество элементов в секциях (денормализация, см. resume/signals.py).
+    # Пересчёт: python manage.py recompute_resume_counters
+    education_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество записей об образовании'
+    )
+    work_experience_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество мест работы'
+    )
+    skills_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество навыков'
+    )
+    achievements_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество достижений'
+    )
+    languages_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество языков'
+    )
+
+    # Превью первой страницы для карточек на дашборде (см. resume/thumbnails.py)
+    thumbnail = models.ImageField(
+        upload_to='resumes/thumbnails/',
+        blank=True,
+        null=True,
+        verbose_name='Превью'
+    )
+    thumbnail_key = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Ключ содержимого превью'
+    )
+
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
@@ -51,12 +114,169 @@ class Resume(models.Model):
         verbose_name = 'Резюме'
         verbose_name_plural = 'Резюме'
         ordering = ['-updated_at']
+        indexes = [
+            # Список резюме пользователя и курсорная пагинация по (updated_at, id) и (created_at, id)
+            models.Index(fields=['user', '-updated_at', '-id'], name='resume_user_updated_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='resume_user_created_idx'),
+            # Основное резюме пользователя: в индексе только строки с is_primary=True
+            models.Index(fields=['user'], condition=Q(is_primary=True), name='resume_user_primary_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
+
+    def save(self, *args, **kwargs):
+        """Сохранение с увеличением ревизии (атомарно, на стороне БД)"""
+        update_fields = kwargs.get('update_fields')
+        bump = self.pk is not None and (
+            update_fields is None or not set(update_fields) <= NON_REVISION_FIELDS
+        )
+        if bump:
+            self.revision = F('revision') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'revision'}
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=['revision'])
+
+    @classmethod
+    def bump_revision(cls, resume_id, **count_deltas):
+        """
+        Увеличить ревизию резюме после изменения его личной информации или секций.
+        count_deltas - изменения счётчиков секций, например education_count=1
+        """
+        counters = {field: F(field) + delta for field, delta in count_deltas.items()}
+        cls.objects.filter(pk=resume_id).update(
+            revision=F('revision') + 1,
+            updated_at=timezone.now(),
+            **counters
+        )
+
+    @property
+    def filled_sections_count(self):
+        """Количество заполненных секций (без запросов к секциям)"""
+        count = 1 if hasattr(self, 'personal_info') else 0
+        return count + sum(1 for field in SECTION_COUNT_FIELDS.values() if getattr(self, field))
     
     # ← ДОБАВЬТЕ ЭТОТ МЕТОД
     def increment_views(self):
         """Увеличить счетчик просмотров"""
         self.views_count += 1
-        self.save(update_fields=['views_count'])
\ No newline at end of file
+        self.save(update_fields=['views_count'])
+
+class ExportJob(models.Model):
+    """Фоновая задача экспорта резюме в PDF/DOCX"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Готово'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('docx', 'DOCX'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    resume = models.ForeignKey(
+        Resume,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        verbose_name='Резюме'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='export_jobs',
+        verbose_name='Пользователь'
+    )
+    export_format = models.CharField(
+        max_length=10,
+        choices=FORMAT_CHOICES,
+        verbose_name='Формат'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True,
+        verbose_name='Статус'
+    )
+    file = models.FileField(
+        upload_to='exports/',
+        blank=True,
+        null=True,
+        verbose_name='Файл'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начало обработки'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Окончание обработки'
+    )
+
+    class Meta:
+        verbose_name = 'Задача экспорта'
+        verbose_name_plural = 'Задачи экспорта'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.resume.title} ({self.export_format}) - {self.get_status_display()}"
+
+
+class ResumeSnapshot(models.Model):
+    """
+    Денормализованная копия резюме для чтения (read model).
+    Хранит готовый ответ ResumeDetailSerializer; нормализованные таблицы
+    остаются моделью записи. Снимок устаревает вместе с ревизией резюме
+    или версией шаблона, см. resume/snapshots.py
+    """
+    resume = models.OneToOneField(
+        Resume,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='snapshot',
+        verbose_name='Резюме'
+    )
+    key = models.CharField(
+        max_length=100,
+        verbose_name='Версия данных'
+    )
+    data = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name='Данные'
+    )
+    built_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата сборки'
+    )
+
+    class Meta:
+        verbose_name = 'Снимок резюме'
+        verbose_name_plural = 'Снимки резюме'
+
+    def __str__(self):
+        return f"{self.resume_id} ({self.key})"
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+from django.conf import settings
+from PIL import Image
+
+
+# Схема URL, по которой WeasyPrint запрашивает фото у url_fetcher пула рендеринга
+PHOTO_URL_SCHEME = 'resume-photo:'
+
+
+def get_renditions_config():
+    """Настройки уменьшенных копий фото из settings.PHOTO_RENDITIONS"""
+    config = getattr(settings, 'PHOTO_RENDITIONS', {})
+    return {
+        'DIR': str(config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'photos'))),
+        # В PDF фото выводится не больше 80px, 240px хватает для печати в 300 dpi
+        'SIZE': config.get('SIZE', 240),
+        'QUALITY': config.get('QUALITY', 85),
+    }
+
+
+def get_photo_rendition(resume):
+    """
+    Имя уменьшенной копии фото резюме в каталоге копий.
+    Копия создаётся один раз и переиспользуется, пока не изменится исходный файл.
+    Возвращает None, если фото нет или его нельзя прочитать с диска.
+    """
+    if not resume.photo:
+        return None
+    try:
+        source_path = resume.photo.path
+        stat = os.stat(source_path)
+    except (ValueError, NotImplementedError, OSError):
+        return None
+
+    config = get_renditions_config()
+    marker = f"{source_path}:{stat.st_size}:{stat.st_mtime_ns}:{config['SIZE']}:{config['QUALITY']}"
+    name = hashlib.sha256(marker.encode('utf-8')).hexdigest()[:32] + '.jpg'
+    rendition_path = os.path.join(config['DIR'], name)
+
+    if not os.path.exists(rendition_path):
+        os.makedirs(config['DIR'], exist_ok=True)
+        with Image.open(source_path) as img:
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.thumbnail((config['SIZE'], config['SIZE']), Image.Resampling.LANCZOS)
+            fd, tmp_path = tempfile.mkstemp(dir=config['DIR'], suffix='.tmp')
+            with os.fdopen(fd, 'wb') as tmp_file:
+                img.save(tmp_file, format='JPEG', quality=config['QUALITY'], optimize=True)
+        os.replace(tmp_path, rendition_path)
+
+    return name
+
+
+def get_photo_url(resume):
+    """Ссылка на уменьшенную копию фото для подстановки в HTML экспорта"""
+    name = get_photo_rendition(resume)
+    return f'{PHOTO_URL_SCHEME}{name}' if name else None
@@ -7,7 +7,8 @@ from io import BytesIO
 from django.core.files.uploadedfile import InMemoryUploadedFile
 import sys
 from .models import Resume
-from .serializers import ResumeDetailSerializer
+from .fast_serializers import resume_detail_serializer
+from .loaders import prefetch_detail
 
 
 class ResumePhotoUploadView(APIView):
@@ -86,7 +87,7 @@ class ResumePhotoUploadView(APIView):
             return Response({
                 'message': 'Фотография успешно загружена и оптимизирована',
                 'photo_url': resume.photo.url,
-                'resume': ResumeDetailSerializer(resume).data
+                'resume': resume_detail_serializer.to_representation(prefetch_detail(resume))
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -111,7 +112,7 @@ class ResumePhotoUploadView(APIView):
         
         return Response({
             'message': 'Фотография успешно удалена',
-            'resume': ResumeDetailSerializer(resume).data
+            'resume': resume_detail_serializer.to_representation(prefetch_detail(resume))
         }, status=status.HTTP_200_OK)
 
 
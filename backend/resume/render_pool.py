@@ -0,0 +1,295 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from .photo_renditions import PHOTO_URL_SCHEME
+
+logger = logging.getLogger(__name__)
+
+
+# Документ для прогрева: заставляет WeasyPrint найти шрифты, разобрать
+# user-agent CSS и инициализировать cairo/pango до первого реального экспорта
+WARMUP_HTML = '''
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+    <h1>Прогрев / Warm up</h1>
+    <h2>Опыт работы</h2>
+    <p><b>Bold</b> <i>Italic</i> — 1234567890</p>
+    <ul><li>•</li></ul>
+</body>
+</html>
+'''
+
+WARMUP_CSS = '''
+@page { size: A4; margin: 0.5cm; }
+body { font-family: sans-serif; font-size: 9pt; }
+h1 { font-size: 16pt; } h2 { font-size: 12pt; font-weight: bold; }
+'''
+
+
+_MAX_CACHED_PHOTOS = 64
+_photo_cache = OrderedDict()
+
+
+def _read_photo(photo_root, name):
+    """Байты уменьшенной копии фото: из памяти процесса или с диска"""
+    data = _photo_cache.get(name)
+    if data is None:
+        with open(os.path.join(photo_root, name), 'rb') as photo_file:
+            data = photo_file.read()
+        _photo_cache[name] = data
+        while len(_photo_cache) > _MAX_CACHED_PHOTOS:
+            _photo_cache.popitem(last=False)
+    else:
+        _photo_cache.move_to_end(name)
+    return data
+
+
+def _make_url_fetcher(photo_root):
+    """
+    url_fetcher для WeasyPrint: ссылки resume-photo: отдаются по ссылке
+    из каталога уменьшенных копий, остальные - стандартным загрузчиком
+    """
+    from weasyprint import default_url_fetcher
+
+    def url_fetcher(url, *args, **kwargs):
+        if photo_root and url.startswith(PHOTO_URL_SCHEME):
+            # basename не даёт выйти за пределы каталога копий
+            name = os.path.basename(url[len(PHOTO_URL_SCHEME):])
+            return {'string': _read_photo(photo_root, name), 'mime_type': 'image/jpeg'}
+        return default_url_fetcher(url, *args, **kwargs)
+
+    return url_fetcher
+
+
+_MAX_CACHED_STYLESHEETS = 32
+_stylesheet_cache = OrderedDict()
+_font_config = None
+
+
+def _get_font_config():
+    """Общая для процесса конфигурация шрифтов WeasyPrint"""
+    global _font_config
+    if _font_config is None:
+        from weasyprint.text.fonts import FontConfiguration
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def _get_stylesheet(key, css_text):
+    """
+    Разобранный объект CSS из кэша процесса.
+    key - версия стилей шаблона; без ключа CSS разбирается заново
+    """
+    from weasyprint import CSS
+
+    if key is None:
+        return CSS(string=css_text, font_config=_get_font_config())
+
+    stylesheet = _stylesheet_cache.get(key)
+    if stylesheet is None:
+        stylesheet = CSS(string=css_text, font_config=_get_font_config())
+        _stylesheet_cache[key] = stylesheet
+        while len(_stylesheet_cache) > _MAX_CACHED_STYLESHEETS:
+            _stylesheet_cache.popitem(last=False)
+    else:
+        _stylesheet_cache.move_to_end(key)
+    return stylesheet
+
+
+def _render_pdf_bytes(html, photo_root=None, stylesheet=None):
+    """
+    Рендеринг HTML в PDF (выполняется в процессе пула или в текущем процессе).
+    stylesheet - пара (ключ версии, текст CSS) или None
+    """
+    from weasyprint import HTML
+
+    stylesheets = [_get_stylesheet(*stylesheet)] if stylesheet else None
+    document = HTML(string=html, url_fetcher=_make_url_fetcher(photo_root))
+    return document.write_pdf(stylesheets=stylesheets, font_config=_get_font_config())
+
+
+def _warm_up_worker():
+    """Инициализатор процесса пула"""
+    try:
+        _render_pdf_bytes(WARMUP_HTML, stylesheet=(None, WARMUP_CSS))
+    except Exception:
+        # Ошибка прогрева не должна ронять процесс: настоящий рендеринг
+        # вернёт понятную ошибку вызывающему коду
+        logger.exception('PDF renderer warm-up failed')
+
+
+def _ping():
+    return os.getpid()
+
+
+def default_pool_size():
+    """
+    Процессов пула на один процесс Django. Пул создаётся в каждом WSGI-воркере,
+    поэтому ядра делятся между воркерами (WEB_CONCURRENCY, как у gunicorn);
+    если число воркеров неизвестно - 2 процесса
+    """
+    web_workers = os.environ.get('WEB_CONCURRENCY', '')
+    if web_workers.isdigit() and int(web_workers) > 0:
+        return max(1, (os.cpu_count() or 1) // int(web_workers))
+    return 2
+
+
+def get_render_pool_config():
+    """Настройки пула из settings.PDF_RENDER_POOL"""
+    config = getattr(settings, 'PDF_RENDER_POOL', {})
+    return {
+        'ENABLED': config.get('ENABLED', True),
+        'SIZE': config.get('SIZE') or default_pool_size(),
+        'MAX_RENDERS_PER_PROCESS': config.get('MAX_RENDERS_PER_PROCESS', 200),
+        'TIMEOUT': config.get('TIMEOUT', 60),
+    }
+
+
+class RendererPool:
+    """
+    Пул постоянных процессов WeasyPrint.
+    Процессы прогреваются при старте и перезапускаются после
+    max_renders рендеров, чтобы не накапливать память
+    (на Python 3.11+, раньше ProcessPoolExecutor этого не умеет).
+    Рендер дольше timeout останавливает весь пул: зависший процесс
+    иначе занимал бы место в пуле навсегда
+    """
+
+    def __init__(self, size, max_renders, timeout):
+        self.size = size
+        self.max_renders = max_renders
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            # После fork (например, gunicorn --preload) пул родителя непригоден
+            if self._executor is None or self._pid != os.getpid():
+                options = {}
+                if sys.version_info >= (3, 11):
+                    options['max_tasks_per_child'] = self.max_renders
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_up_worker,
+                    **options
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def start(self):
+        """Запустить и прогреть все процессы пула"""
+        executor = self._get_executor()
+        futures = [executor.submit(_ping) for _ in range(self.size)]
+        return {future.result(timeout=self.timeout) for future in futures}
+
+    def render(self, html, photo_root=None, stylesheet=None):
+        """Отрендерить HTML в PDF в одном из процессов пула"""
+        try:
+            return self._render(html, photo_root, stylesheet)
+        except BrokenProcessPool:
+            # Процесс упал (например, OOM) - пересоздаём пул и повторяем один раз
+            logger.warning('PDF renderer pool is broken, restarting')
+            self.shutdown()
+            return self._render(html, photo_root, stylesheet)
+
+    def _render(self, html, photo_root, stylesheet):
+        future = self._get_executor().submit(_render_pdf_bytes, html, photo_root, stylesheet)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            logger.warning('PDF render timed out after %ss, restarting pool', self.timeout)
+            self.shutdown(kill=True)
+            raise
+
+    def shutdown(self, kill=False):
+        """
+        Остановить пул. kill - завершить процессы сразу, не дожидаясь текущих
+        рендеров (они получат BrokenProcessPool и повторятся в новом пуле)
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                processes = list((self._executor._processes or {}).values()) if kill else []
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                for process in processes:
+                    process.kill()
+            self._executor = None
+            self._pid = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_disabled = False
+
+
+def disable_render_pool():
+    """
+    Рендерить PDF в текущем процессе.
+    Для процессов, которые сами являются воркерами (например, export_resumes),
+    чтобы они не запускали вложенный пул
+    """
+    global _pool_disabled
+    _pool_disabled = True
+
+
+def get_render_pool():
+    """Общий для процесса пул рендеринга или None, если пул отключён"""
+    global _pool
+    config = get_render_pool_config()
+    if _pool_disabled or not config['ENABLED']:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = RendererPool(
+                size=config['SIZE'],
+                max_renders=config['MAX_RENDERS_PER_PROCESS'],
+                timeout=config['TIMEOUT'],
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def warm_up_render_pool(background=True):
+    """
+    Прогрев пула при старте приложения (вызывается из wsgi.py).
+    По умолчанию выполняется в фоне, чтобы не задерживать запуск сервера.
+    """
+    pool = get_render_pool()
+    if pool is None:
+        return
+
+    def start():
+        try:
+            pool.start()
+        except Exception:
+            logger.exception('Failed to start PDF renderer pool')
+
+    if background:
+        threading.Thread(target=start, name='pdf-pool-warmup', daemon=True).start()
+    else:
+        start()
+
+
+def render_pdf(html, photo_root=None, stylesheet=None):
+    """
+    Рендеринг HTML в байты PDF: через пул процессов или в текущем процессе.
+    photo_root - каталог уменьшенных копий фото для ссылок resume-photo:,
+    stylesheet - (ключ версии, текст CSS) печатных стилей шаблона
+    """
+    pool = get_render_pool()
+    if pool is None:
+        return _render_pdf_bytes(html, photo_root, stylesheet)
+    return pool.render(html, photo_root, stylesheet)
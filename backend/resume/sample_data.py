@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from template.models import Template
+from personalinfo.models import PersonalInfo
+from education.models import Education
+from workexperlence.models import WorkExperience
+from skill.models import Skill
+from achievement.models import Achievement
+from language.models import Language
+from .models import Resume
+
+
+def add_sample_items(resume, items, start=0):
+    """Добавить по items элементов в каждую секцию резюме (порядок продолжается с start)"""
+    begin = date(2010, 1, 1)
+    text = 'Описание обязанностей и результатов. ' * 10
+    numbers = range(start, start + items)
+    Education.objects.bulk_create(
+        Education(
+            resume=resume, institution=f'Университет {i}', degree='Бакалавр', field_of_study='Информатика',
+            start_date=begin + timedelta(days=i * 30), end_date=begin + timedelta(days=i * 30 + 1000),
+            description=text, order=i
+        ) for i in numbers
+    )
+    WorkExperience.objects.bulk_create(
+        WorkExperience(
+            resume=resume, company=f'Компания {i}', position='Инженер',
+            start_date=begin + timedelta(days=i * 30), end_date=begin + timedelta(days=i * 30 + 365),
+            is_current=False, description=text, order=i
+        ) for i in numbers
+    )
+    levels = [value for value, _ in Skill.LEVEL_CHOICES]
+    categories = [value for value, _ in Skill.CATEGORY_CHOICES]
+    Skill.objects.bulk_create(
+        Skill(
+            resume=resume, name=f'Навык {i}', level=levels[i % len(levels)],
+            category=categories[i % len(categories)], order=i
+        ) for i in numbers
+    )
+    Achievement.objects.bulk_create(
+        Achievement(
+            resume=resume, title=f'Достижение {i}', description=text,
+            date=begin + timedelta(days=i * 30), order=i
+        ) for i in numbers
+    )
+    proficiency = [value for value, _ in Language.PROFICIENCY_CHOICES]
+    Language.objects.bulk_create(
+        Language(
+            resume=resume, language=f'Язык {i}', proficiency_level=proficiency[i % len(proficiency)], order=i
+        ) for i in numbers
+    )
+
+    # bulk_create не вызывает сигналы, поэтому счётчики секций и ревизия обновляются явно
+    Resume.bump_revision(
+        resume.pk, education_count=items, work_experience_count=items, skills_count=items,
+        achievements_count=items, languages_count=items
+    )
+
+
+def create_sample_resume(items, username='benchmark-user', user=None, template=None):
+    """
+    Резюме с заданным количеством элементов в каждой секции для замеров и тестов.
+    Без user и template создаются пользователь username и новый шаблон.
+    Вне тестов вызывайте внутри транзакции, которая затем откатывается
+    """
+    if user is None:
+        user, _ = get_user_model().objects.get_or_create(
+            username=username, defaults={'email': f'{username}@example.com'}
+        )
+    if template is None:
+        template = Template.objects.create(
+            name='Benchmark', html_structure='<div>{{full_name}}</div>', css_styles='', created_by=user
+        )
+    resume = Resume.objects.create(user=user, template=template, title='Большое резюме')
+    PersonalInfo.objects.create(
+        resume=resume, full_name='Иван Иванов', phone='+996 555 000 000', email='ivan@example.com',
+        address='Бишкек', linkedin='https://linkedin.com/in/ivan', website='https://example.com',
+        summary='Опытный разработчик. ' * 20
+    )
+    add_sample_items(resume, items)
+    return resume
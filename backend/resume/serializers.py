@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Resume
+from django.db.models import F
+from django.urls import reverse
+from .models import Resume, ExportJob, TOTAL_SECTIONS
 from personalinfo.models import PersonalInfo
 from education.models import Education
 from workexperlence.models import WorkExperience
@@ -108,8 +110,8 @@ class ResumeListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = ('id', 'title', 'template', 'template_name', 'personal_info_name', 
-                  'photo', 'is_primary', 'has_complete_info', 'views_count', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at', 'views_count')
+                  'photo', 'thumbnail', 'is_primary', 'has_complete_info', 'views_count', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'thumbnail', 'created_at', 'updated_at', 'views_count')
     
     def get_personal_info_name(self, obj):
         """Получение имени из личной информации"""
@@ -121,8 +123,8 @@ class ResumeListSerializer(serializers.ModelSerializer):
         """Проверка наличия основной информации"""
         return (
             hasattr(obj, 'personal_info') and
-            obj.education.exists() and
-            obj.work_experience.exists()
+            obj.education_count > 0 and
+            obj.work_experience_count > 0
         )
 
 
@@ -149,33 +151,18 @@ class ResumeDetailSerializer(serializers.ModelSerializer):
             'personal_info', 'education', 'work_experience', 'skills', 
             'achievements', 'languages',
             'sections_count', 'completion_percentage',
-            'views_count',
+            'views_count', 'revision',
             'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'revision', 'created_at', 'updated_at')
     
     def get_sections_count(self, obj):
-        """Подсчет заполненных секций"""
-        count = 0
-        if hasattr(obj, 'personal_info'):
-            count += 1
-        if obj.education.exists():
-            count += 1
-        if obj.work_experience.exists():
-            count += 1
-        if obj.skills.exists():
-            count += 1
-        if obj.achievements.exists():
-            count += 1
-        if obj.languages.exists():
-            count += 1
-        return count
+        """Подсчет заполненных секций (по счётчикам в строке резюме)"""
+        return obj.filled_sections_count
     
     def get_completion_percentage(self, obj):
         """Процент заполнения резюме"""
-        total_sections = 6
-        filled_sections = self.get_sections_count(obj)
-        return round((filled_sections / total_sections) * 100)
+        return round((obj.filled_sections_count / TOTAL_SECTIONS) * 100)
 
 
 class ResumeCreateUpdateSerializer(serializers.ModelSerializer):
@@ -198,10 +185,14 @@ class ResumeCreateUpdateSerializer(serializers.ModelSerializer):
             # Если устанавливаем резюме как основное, снимаем флаг с других
             if self.instance:
                 # Обновление существующего резюме
-                Resume.objects.filter(user=user, is_primary=True).exclude(pk=self.instance.pk).update(is_primary=False)
+                Resume.objects.filter(user=user, is_primary=True).exclude(pk=self.instance.pk).update(
+                    is_primary=False, revision=F('revision') + 1
+                )
             else:
                 # Создание нового резюме
-                Resume.objects.filter(user=user, is_primary=True).update(is_primary=False)
+                Resume.objects.filter(user=user, is_primary=True).update(
+                    is_primary=False, revision=F('revision') + 1
+                )
         return value
 
     def create(self, validated_data):
@@ -216,4 +207,26 @@ class ResumeCreateUpdateSerializer(serializers.ModelSerializer):
             # Можно добавить дополнительную логику при смене шаблона
             pass
         
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Статус фоновой задачи экспорта"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ('id', 'resume', 'export_format', 'status', 'status_display', 'error',
+                  'status_url', 'download_url', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        return reverse('resume:export_job_status', args=[obj.pk])
+
+    def get_download_url(self, obj):
+        """Ссылка на скачивание появляется только у готовой задачи"""
+        if obj.status != ExportJob.STATUS_DONE:
+            return None
+        return reverse('resume:export_job_download', args=[obj.pk])
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Resume, SECTION_COUNT_FIELDS, NON_REVISION_FIELDS
+from .thumbnails import schedule_thumbnail, delete_thumbnail, mark_thumbnails_stale
+from .snapshots import schedule_snapshot
+from personalinfo.models import PersonalInfo
+from education.models import Education
+from workexperlence.models import WorkExperience
+from skill.models import Skill
+from achievement.models import Achievement
+from language.models import Language
+from template.models import Template
+
+
+# Модели секций: их изменение меняет содержимое резюме
+SECTION_MODELS = (PersonalInfo, Education, WorkExperience, Skill, Achievement, Language)
+
+# Поля резюме, которые не влияют на внешний вид
+NON_CONTENT_FIELDS = {'views_count', 'is_primary', 'thumbnail', 'thumbnail_key'}
+
+
+@receiver(post_save, sender=Resume)
+def resume_saved(sender, instance, update_fields=None, **kwargs):
+    """Пересборка снимка и перегенерация превью после изменения резюме"""
+    if update_fields and set(update_fields) <= NON_REVISION_FIELDS:
+        return
+    schedule_snapshot(instance.pk)
+    if update_fields and set(update_fields) <= NON_CONTENT_FIELDS:
+        return
+    schedule_thumbnail(instance.pk)
+
+
+@receiver(post_delete, sender=Resume)
+def resume_deleted(sender, instance, **kwargs):
+    """Удаление файла превью вместе с резюме"""
+    if instance.thumbnail:
+        delete_thumbnail(instance.thumbnail.name)
+
+
+def _count_delta(section_model, delta):
+    """Изменение счётчика секции в Resume (у личной информации счётчика нет)"""
+    related_name = section_model._meta.get_field('resume').remote_field.related_name
+    field = SECTION_COUNT_FIELDS.get(related_name)
+    return {field: delta} if field else {}
+
+
+def section_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Новая ревизия резюме, счётчик секции, снимок и превью после сохранения"""
+    if raw:
+        return
+    count_deltas = _count_delta(sender, 1) if created else {}
+    Resume.bump_revision(instance.resume_id, **count_deltas)
+    schedule_snapshot(instance.resume_id)
+    schedule_thumbnail(instance.resume_id)
+
+
+def section_deleted(sender, instance, origin=None, **kwargs):
+    """Новая ревизия резюме, счётчик секции, снимок и превью после удаления"""
+    # Каскадное удаление вместе с резюме или пользователем: обновлять нечего
+    if isinstance(origin, (Resume, get_user_model())):
+        return
+    Resume.bump_revision(instance.resume_id, **_count_delta(sender, -1))
+    schedule_snapshot(instance.resume_id)
+    schedule_thumbnail(instance.resume_id)
+
+
+for section_model in SECTION_MODELS:
+    post_save.connect(section_saved, sender=section_model, dispatch_uid=f'section_save_{section_model.__name__}')
+    post_delete.connect(section_deleted, sender=section_model, dispatch_uid=f'section_delete_{section_model.__name__}')
+
+
+# Поля шаблона, от которых зависит внешний вид резюме
+TEMPLATE_LAYOUT_FIELDS = ('html_structure', 'css_styles')
+
+
+@receiver(pre_save, sender=Template)
+def template_saving(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Запомнить, меняется ли вёрстка шаблона"""
+    instance._layout_changed = False
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(TEMPLATE_LAYOUT_FIELDS):
+        return
+    previous = Template.objects.filter(pk=instance.pk).values_list(*TEMPLATE_LAYOUT_FIELDS).first()
+    layout = tuple(getattr(instance, field) for field in TEMPLATE_LAYOUT_FIELDS)
+    instance._layout_changed = previous is not None and previous != layout
+
+
+@receiver(post_save, sender=Template)
+def template_saved(sender, instance, **kwargs):
+    """
+    Снимки резюме пересобираются при чтении: в их ключе есть updated_at шаблона.
+    Превью перерисовываются только при изменении HTML/CSS: они помечаются
+    устаревшими и перерисовываются по одному в фоне (см. mark_thumbnails_stale)
+    """
+    if getattr(instance, '_layout_changed', False):
+        mark_thumbnails_stale(instance.resumes.all())
@@ -0,0 +1,84 @@
+from django.db.models import F
+from django.db.models.fields.json import KeyTransform
+from .models import Resume, ResumeSnapshot
+from .loaders import load_resume
+from .fast_serializers import resume_detail_serializer
+from .background import ResumeTaskQueue
+
+
+# Версия структуры снимка: увеличьте при изменении ResumeDetailSerializer,
+# чтобы все снимки пересобрались при следующем чтении
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_key(revision, template_id, template_updated_at):
+    """Версия данных, по которой проверяется актуальность снимка"""
+    stamp = template_updated_at.isoformat() if template_updated_at else ''
+    return f'v{SNAPSHOT_VERSION}:{revision}:{template_id or ""}:{stamp}'
+
+
+def build_snapshot(resume_id):
+    """Пересобрать снимок резюме из нормализованных таблиц"""
+    try:
+        resume = load_resume(pk=resume_id)
+    except Resume.DoesNotExist:
+        return None
+
+    data = resume_detail_serializer.to_representation(resume)
+    key = snapshot_key(
+        resume.revision,
+        resume.template_id,
+        resume.template.updated_at if resume.template else None
+    )
+    ResumeSnapshot.objects.update_or_create(resume_id=resume.pk, defaults={'key': key, 'data': data})
+    return data
+
+
+def get_snapshot(pk, keys=None, **filters):
+    """
+    Резюме для чтения одним запросом по первичному ключу.
+    Возвращает словарь полей строки резюме с готовыми данными в 'data'
+    или None, если резюме не найдено. Устаревший снимок пересобирается на месте.
+    keys - ключи снимка, которые нужно вернуть (None - все); остальные
+    не читаются из БД
+    """
+    queryset = Resume.objects.filter(pk=pk, **filters)
+    if keys is None:
+        queryset = queryset.annotate(_data=F('snapshot__data'))
+    else:
+        queryset = queryset.annotate(**{
+            f'_data_{index}': KeyTransform(key, 'snapshot__data') for index, key in enumerate(keys)
+        })
+    row = queryset.values(
+        'user_id', 'revision', 'views_count', 'template_id', 'template__updated_at',
+        'snapshot__key', *(['_data'] if keys is None else [f'_data_{index}' for index in range(len(keys))])
+    ).first()
+    if row is None:
+        return None
+
+    stored_key = row.pop('snapshot__key')
+    if keys is None:
+        data = row.pop('_data')
+    else:
+        data = {key: row.pop(f'_data_{index}') for index, key in enumerate(keys)}
+    key = snapshot_key(row['revision'], row['template_id'], row['template__updated_at'])
+    if stored_key is None or stored_key != key:
+        data = build_snapshot(pk)
+        if data is None:
+            return None
+        if keys is not None:
+            data = {key: data[key] for key in keys}
+
+    # Счётчик просмотров меняется без новой ревизии, поэтому берётся из строки резюме
+    if 'views_count' in data:
+        data['views_count'] = row['views_count']
+    row['data'] = data
+    return row
+
+
+_queue = ResumeTaskQueue('resume-snapshot', build_snapshot)
+
+
+def schedule_snapshot(resume_id):
+    """Пересобрать снимок в фоне после фиксации транзакции"""
+    _queue.schedule(resume_id)
@@ -0,0 +1,190 @@
+import re
+import threading
+from collections import OrderedDict
+
+
+# Плейсхолдеры, которые понимает генератор HTML резюме
+PERSONAL_INFO_PLACEHOLDERS = (
+    'full_name', 'email', 'phone', 'address', 'linkedin', 'website', 'summary',
+)
+SECTION_PLACEHOLDERS = (
+    'work_experience', 'education', 'skills', 'achievements', 'rewards', 'languages',
+)
+KNOWN_PLACEHOLDERS = frozenset(('photo',) + PERSONAL_INFO_PLACEHOLDERS + SECTION_PLACEHOLDERS)
+
+# Условия, поддерживаемые в блоках {{#if ...}}
+KNOWN_CONDITIONS = frozenset(('photo',))
+
+_TOKEN_RE = re.compile(r'\{\{\s*(#if\s+\w+|else|/if|\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """
+    Шаблон, разобранный в план рендеринга: чередование литералов и слотов.
+    Для каждой комбинации условий план заранее развёрнут в плоский список,
+    поэтому рендеринг - один проход с ''.join().
+    """
+
+    def __init__(self, tree):
+        self.conditions = frozenset(_collect_conditions(tree))
+        self.placeholders = frozenset(_collect_placeholders(tree))
+        self._plans = {}
+        for flags in _condition_combinations(sorted(self.conditions)):
+            literals, slots = [], []
+            _flatten(tree, flags, literals, slots)
+            self._plans[frozenset(name for name, enabled in flags.items() if enabled)] = (
+                tuple(literals), tuple(slots)
+            )
+
+    def render(self, values, conditions=()):
+        """
+        Подставить значения за один проход.
+        values - словарь {плейсхолдер: строка}, conditions - имена истинных условий
+        """
+        literals, slots = self._plans[frozenset(conditions) & self.conditions]
+        parts = [literals[0]]
+        append = parts.append
+        for name, literal in zip(slots, literals[1:]):
+            append(values.get(name, ''))
+            append(literal)
+        return ''.join(parts)
+
+
+def _parse(source):
+    """
+    Разбор исходного HTML в дерево: строки, ('slot', имя), ['if', условие, then, else, ...].
+    Незакрытые блоки, как и неизвестные теги, остаются в тексте как есть
+    """
+    root = []
+    stack = [(None, root, None)]
+    position = 0
+
+    for match in _TOKEN_RE.finditer(source):
+        token = match.group(1)
+        current = stack[-1][1]
+        keep_literal = False
+
+        if token.startswith('#if'):
+            condition = token[3:].strip()
+            if condition in KNOWN_CONDITIONS:
+                current.append(source[position:match.start()])
+                # Текст тегов {{#if}} и {{else}} нужен, если блок не будет закрыт
+                node = ['if', condition, [], [], match.group(0), None]
+                current.append(node)
+                stack.append((node, node[2], 'then'))
+            else:
+                keep_literal = True
+        elif token == 'else':
+            node, _, branch = stack[-1]
+            if node is not None and branch == 'then':
+                current.append(source[position:match.start()])
+                node[5] = match.group(0)
+                stack[-1] = (node, node[3], 'else')
+            else:
+                keep_literal = True
+        elif token == '/if':
+            node = stack[-1][0]
+            if node is not None:
+                current.append(source[position:match.start()])
+                stack.pop()
+            else:
+                keep_literal = True
+        elif token in KNOWN_PLACEHOLDERS:
+            current.append(source[position:match.start()])
+            current.append(('slot', token))
+        else:
+            keep_literal = True
+
+        if keep_literal:
+            # Неизвестные теги оставляем в тексте как есть
+            current.append(source[position:match.end()])
+        position = match.end()
+
+    while len(stack) > 1:
+        # Незакрытый блок - последний элемент родителя: заменяем его текстом блока
+        node = stack.pop()[0]
+        parent = stack[-1][1]
+        parent.pop()
+        parent.append(node[4])
+        parent.extend(node[2])
+        if node[5] is not None:
+            parent.append(node[5])
+            parent.extend(node[3])
+    root.append(source[position:])
+    return root
+
+
+def _collect_placeholders(tree):
+    for node in tree:
+        if isinstance(node, tuple):
+            yield node[1]
+        elif isinstance(node, list):
+            yield from _collect_placeholders(node[2])
+            yield from _collect_placeholders(node[3])
+
+
+def _collect_conditions(tree):
+    for node in tree:
+        if isinstance(node, list):
+            yield node[1]
+            yield from _collect_conditions(node[2])
+            yield from _collect_conditions(node[3])
+
+
+def _condition_combinations(names):
+    if not names:
+        yield {}
+        return
+    for rest in _condition_combinations(names[1:]):
+        yield {names[0]: True, **rest}
+        yield {names[0]: False, **rest}
+
+
+def _flatten(tree, flags, literals, slots):
+    """Развернуть дерево в чередование литералов и слотов для заданных условий"""
+    if not literals:
+        literals.append('')
+    for node in tree:
+        if isinstance(node, str):
+            literals[-1] += node
+        elif isinstance(node, tuple):
+            slots.append(node[1])
+            literals.append('')
+        else:
+            branch = node[2] if flags[node[1]] else node[3]
+            _flatten(branch, flags, literals, slots)
+
+
+def compile_template_source(source):
+    """Скомпилировать строку HTML шаблона (без кэширования)"""
+    return CompiledTemplate(_parse(source or ''))
+
+
+_MAX_CACHED_TEMPLATES = 128
+_compiled_cache = OrderedDict()
+_compiled_cache_lock = threading.Lock()
+
+
+def get_compiled_template(template):
+    """
+    Скомпилированный шаблон из кэша процесса.
+    Ключ - (id, updated_at), поэтому правка шаблона в админке даёт новую версию.
+    """
+    if template.pk is None:
+        return compile_template_source(template.html_structure)
+
+    key = (template.pk, template.updated_at)
+    with _compiled_cache_lock:
+        compiled = _compiled_cache.get(key)
+        if compiled is not None:
+            _compiled_cache.move_to_end(key)
+            return compiled
+
+    compiled = compile_template_source(template.html_structure)
+
+    with _compiled_cache_lock:
+        _compiled_cache[key] = compiled
+        _compiled_cache.move_to_end(key)
+        while len(_compiled_cache) > _MAX_CACHED_TEMPLATES:
+            _compiled_cache.popitem(last=False)
+    return compiled
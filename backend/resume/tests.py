@@ -1,3 +1,646 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock, skipUnless
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+from template.models import Template
+from personalinfo.models import PersonalInfo
+from education.models import Education
+from workexperlence.models import WorkExperience
+from skill.models import Skill
+from achievement.models import Achievement
+from language.models import Language
+from resumebuilder.testing import IndexUsageTestCase, QueryBudgetTestCase
+from .models import Resume, ExportJob
+from .serializers import ResumeListSerializer, ResumeDetailSerializer
+from .fast_serializers import resume_list_serializer, resume_detail_serializer
+from .loaders import SECTION_RELATIONS, detail_queryset, load_resume, supports_json_loading
+from . import export_jobs, thumbnails
+from .background import ResumeTaskQueue
+from .export_jobs import enqueue_export, fail_stale_jobs, delete_expired_jobs
+from .thumbnails import STALE_THUMBNAIL_KEY
+from .template_compiler import compile_template_source
+from .export_utils import generate_html_from_template
+from .render_pool import RendererPool, get_render_pool_config
+from .sample_data import add_sample_items, create_sample_resume
+from .snapshots import build_snapshot
 
-# Create your tests here.
+
+class ResumeListQueriesTest(TestCase):
+    """Список резюме строится за постоянное число запросов"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='owner', email='owner@example.com', password='password'
+        )
+        self.template = Template.objects.create(
+            name='Классический', html_structure='<h1>{{full_name}}</h1>', css_styles='h1 {}'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_resumes(self, count):
+        for i in range(count):
+            resume = Resume.objects.create(user=self.user, template=self.template, title=f'Резюме {i}')
+            PersonalInfo.objects.create(resume=resume, full_name='Иван Иванов', email='ivan@example.com')
+            Education.objects.create(
+                resume=resume, institution='КГТУ', degree='Бакалавр',
+                field_of_study='Информатика', start_date=date(2015, 9, 1)
+            )
+            if i % 2 == 0:
+                WorkExperience.objects.create(
+                    resume=resume, company='ООО Ромашка', position='Разработчик',
+                    start_date=date(2019, 1, 1), is_current=True
+                )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        url = reverse('resume:list')
+
+        self.create_resumes(2)
+        # COUNT для пагинации + одна выборка страницы
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.create_resumes(8)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 10)
+
+        results = response.data['results']
+        self.assertTrue(all(item['template_name'] == 'Классический' for item in results))
+        self.assertTrue(all(item['personal_info_name'] == 'Иван Иванов' for item in results))
+        self.assertEqual(sum(item['has_complete_info'] for item in results), 5)
+
+
+class QueryIndexesTest(IndexUsageTestCase):
+    """Частые запросы к резюме и их секциям идут по составным индексам"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f'user{i}', email=f'user{i}@example.com') for i in range(20)
+        )
+        template = Template.objects.create(name='Классический', html_structure='', css_styles='')
+        resumes = Resume.objects.bulk_create(
+            Resume(user=user, template=template, title=f'Резюме {i}', is_primary=(i == 0))
+            for user in users for i in range(5)
+        )
+        cls.user = users[0]
+        cls.resume = resumes[0]
+
+        for resume in resumes:
+            Education.objects.bulk_create(
+                Education(
+                    resume=resume, institution='КГТУ', degree='Бакалавр', field_of_study='Информатика',
+                    start_date=date(2015, 9, 1), order=i
+                ) for i in range(3)
+            )
+            WorkExperience.objects.bulk_create(
+                WorkExperience(
+                    resume=resume, company='ООО Ромашка', position='Разработчик',
+                    start_date=date(2019, 1, 1), is_current=True, order=i
+                ) for i in range(3)
+            )
+            Skill.objects.bulk_create(Skill(resume=resume, name=f'Навык {i}', order=i) for i in range(3))
+            Achievement.objects.bulk_create(
+                Achievement(resume=resume, title=f'Достижение {i}', order=i) for i in range(3)
+            )
+            Language.objects.bulk_create(Language(resume=resume, language=f'Язык {i}', order=i) for i in range(3))
+
+    def test_resume_items_use_resume_order_index(self):
+        for model, index_name in (
+            (Education, 'education_resume_order_idx'),
+            (WorkExperience, 'work_exp_resume_order_idx'),
+            (Skill, 'skill_resume_order_idx'),
+            (Achievement, 'achievement_resume_order_idx'),
+            (Language, 'language_resume_order_idx'),
+        ):
+            with self.subTest(model=model.__name__):
+                # Запрос BaseResumeItemViewSet.get_queryset
+                self.assertUsesIndex(
+                    model.objects.filter(resume=self.resume).order_by('order', '-id'), index_name
+                )
+
+    def test_resume_list_uses_user_updated_index(self):
+        self.assertUsesIndex(
+            Resume.objects.filter(user=self.user).order_by('-updated_at'), 'resume_user_updated_idx'
+        )
+
+    def test_primary_resume_uses_partial_index(self):
+        self.assertUsesIndex(
+            Resume.objects.filter(user=self.user, is_primary=True), 'resume_user_primary_idx'
+        )
+
+
+def make_photo(name='photo.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (40, 40), 'navy').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def weasyprint_available():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+class FastSerializerTest(TestCase):
+    """Скомпилированные сериализаторы отдают то же, что и DRF"""
+
+    def setUp(self):
+        self.resume = create_sample_resume(2)
+        self.bare = Resume.objects.create(user=self.resume.user, title='Пустое резюме')
+        self.request = RequestFactory().get('/api/resumes/')
+
+    def assertSameData(self, fast, expected):
+        self.assertEqual(fast, expected)
+        self.assertEqual(list(fast), list(expected))
+
+    def check(self, resume, request=None):
+        context = {'request': request}
+        resume = detail_queryset().get(pk=resume.pk)
+        self.assertSameData(
+            resume_detail_serializer.to_representation(resume, request),
+            ResumeDetailSerializer(resume, context=context).data
+        )
+        resumes = list(Resume.objects.select_related('template', 'personal_info').order_by('pk'))
+        self.assertSameData(
+            resume_list_serializer.many(resumes, request),
+            ResumeListSerializer(resumes, many=True, context=context).data
+        )
+
+    def test_sections_with_display_fields(self):
+        Skill.objects.filter(resume=self.resume).update(level='expert')
+        data = resume_detail_serializer.to_representation(detail_queryset().get(pk=self.resume.pk))
+        self.assertEqual({skill['level_display'] for skill in data['skills']}, {'Эксперт'})
+        self.assertTrue(all(language['proficiency_display'] for language in data['languages']))
+        self.check(self.resume)
+
+    def test_without_template_and_personal_info(self):
+        data = resume_list_serializer.to_representation(self.bare)
+        # template.name у резюме без шаблона DRF пропускает (SkipField)
+        self.assertNotIn('template_name', data)
+        self.assertIsNone(data['personal_info_name'])
+        self.check(self.bare)
+
+    def test_photo_url(self):
+        Resume.objects.filter(pk=self.resume.pk).update(
+            photo='resumes/photos/photo.png', thumbnail='resumes/thumbnails/thumb.webp'
+        )
+        relative = resume_list_serializer.to_representation(Resume.objects.get(pk=self.resume.pk))
+        self.assertEqual(relative['photo'], '/media/resumes/photos/photo.png')
+        absolute = resume_list_serializer.to_representation(Resume.objects.get(pk=self.resume.pk), self.request)
+        self.assertEqual(absolute['photo'], 'http://testserver/media/resumes/photos/photo.png')
+        self.check(self.resume)
+        self.check(self.resume, self.request)
+
+
+class ResumeLoaderTest(TestCase):
+    """load_resume: те же данные секций, что и при обычном prefetch"""
+
+    def setUp(self):
+        self.resume = create_sample_resume(3)
+        Education.objects.filter(resume=self.resume).update(order=0)
+        WorkExperience.objects.filter(resume=self.resume, order=1).update(end_date=None, is_current=True)
+
+    def section_rows(self, resume, relation):
+        return [
+            [(field.attname, getattr(item, field.attname)) for field in item._meta.concrete_fields]
+            for item in getattr(resume, relation).all()
+        ]
+
+    @skipUnless(supports_json_loading(), 'Загрузка через JSON есть только на PostgreSQL')
+    def test_json_sections_match_prefetch(self):
+        with self.assertNumQueries(1):
+            loaded = load_resume(pk=self.resume.pk)
+            sections = {relation: self.section_rows(loaded, relation) for relation in SECTION_RELATIONS}
+            personal_info = loaded.personal_info
+        expected = detail_queryset().get(pk=self.resume.pk)
+
+        for relation in SECTION_RELATIONS:
+            with self.subTest(relation=relation):
+                rows = self.section_rows(expected, relation)
+                # Порядок, значения и их типы (даты, NULL), а не только строковое представление
+                self.assertEqual(sections[relation], rows)
+                self.assertEqual(
+                    [[type(value) for _, value in row] for row in sections[relation]],
+                    [[type(value) for _, value in row] for row in rows]
+                )
+        self.assertEqual(
+            [getattr(personal_info, field.attname) for field in personal_info._meta.concrete_fields],
+            [getattr(expected.personal_info, field.attname) for field in personal_info._meta.concrete_fields]
+        )
+
+    def test_only_requested_relations(self):
+        with self.assertNumQueries(1 if supports_json_loading() else 2):
+            loaded = load_resume(relations=('skills',), pk=self.resume.pk)
+        self.assertEqual(set(loaded._prefetched_objects_cache), {'skills'})
+        self.assertEqual(loaded.personal_info.full_name, 'Иван Иванов')
+
+
+class ResumeQueryBudgetTest(QueryBudgetTestCase):
+    """Бюджет запросов маршрутов резюме: api/resumes/"""
+
+    def new_resume(self):
+        # После grow() резюме создаётся с большим числом элементов: удаление не должно расти с ними
+        resume = create_sample_resume(self.grown_items, user=self.owner, template=self.template)
+        build_snapshot(resume.pk)
+        return resume
+
+    def test_list(self):
+        self.assertQueryBudget(2, 'get', reverse('resume:list'))
+        self.assertQueryBudget(1, 'get', reverse('resume:list'), {'pagination': 'cursor'})
+
+    def test_create(self):
+        self.assertQueryBudget(
+            8, 'post', reverse('resume:create'), {'title': 'Новое резюме', 'template': self.template.pk},
+            status_code=201
+        )
+
+    def test_detail(self):
+        self.assertQueryBudget(1, 'get', reverse('resume:detail', args=[self.resume.pk]))
+
+    def test_update(self):
+        url = reverse('resume:update', args=[self.resume.pk])
+        self.assertQueryBudget(10, 'patch', url, {'title': 'Обновлённое резюме'})
+        self.assertQueryBudget(12, 'put', url, {'title': 'Резюме', 'template': self.template.pk, 'is_primary': True})
+
+    def test_delete(self):
+        self.assertQueryBudget(
+            17, 'delete', lambda resume: reverse('resume:delete', args=[resume.pk]),
+            status_code=204, prepare=self.new_resume
+        )
+
+    def test_copy(self):
+        self.assertQueryBudget(
+            21, 'post', reverse('resume:copy', args=[self.resume.pk]), status_code=201
+        )
+
+    def test_set_primary(self):
+        self.assertQueryBudget(
+            6, 'post', lambda resume: reverse('resume:set_primary', args=[resume.pk]), prepare=self.new_resume
+        )
+
+    def test_preview(self):
+        # Шаблона resume/preview_template.html нет в проекте: маршрут отвечает 500,
+        # но данные для него читаются из снимка и число запросов проверяется
+        self.assertQueryBudget(
+            2, 'get', reverse('resume:preview', args=[self.resume.pk]), status_code=None
+        )
+
+    def test_public(self):
+        self.client.force_authenticate(None)
+        self.assertQueryBudget(2, 'get', reverse('resume:public', args=[self.resume.pk]))
+
+    def test_views_stats(self):
+        self.assertQueryBudget(1, 'get', reverse('resume:views_stats', args=[self.resume.pk]))
+
+    def test_increment_views(self):
+        self.assertQueryBudget(
+            2, 'post', reverse('resume:increment_views', args=[self.resume.pk])
+        )
+
+    def test_photo(self):
+        url = reverse('resume:photo_upload', args=[self.resume.pk])
+        self.assertQueryBudget(10, 'post', url, lambda: {'photo': make_photo()}, format='multipart')
+        self.assertQueryBudget(
+            1, 'get', reverse('resume:photo_info', args=[self.resume.pk])
+        )
+        self.assertQueryBudget(
+            10, 'delete', url, prepare=lambda: Resume.objects.filter(pk=self.resume.pk).update(
+                photo=make_photo().name
+            )
+        )
+
+    @skipUnless(weasyprint_available(), 'WeasyPrint недоступен')
+    def test_export_pdf(self):
+        self.assertQueryBudget(6, 'get', reverse('resume:export_pdf', args=[self.resume.pk]))
+
+    def test_export_docx(self):
+        self.assertQueryBudget(6, 'get', reverse('resume:export_docx', args=[self.resume.pk]))
+
+    def test_export_jobs(self):
+        self.assertQueryBudget(
+            3, 'post', lambda resume: reverse('resume:export_job_create', args=[resume.pk]), {'format': 'docx'},
+            status_code=202, prepare=self.new_resume
+        )
+
+        def done_job():
+            job = ExportJob.objects.create(
+                resume=self.resume, user=self.owner, export_format='docx', status=ExportJob.STATUS_DONE
+            )
+            job.file.save(f'{job.pk}.docx', ContentFile(b'docx'))
+            return job
+
+        self.assertQueryBudget(
+            1, 'get', lambda job: reverse('resume:export_job_status', args=[job.pk]), prepare=done_job
+        )
+        self.assertQueryBudget(
+            1, 'get', lambda job: reverse('resume:export_job_download', args=[job.pk]), prepare=done_job
+        )
+
+    def test_export_archive(self):
+        # Архив содержит файл на каждое резюме, поэтому запросы на файл неизбежны;
+        # от объёма секций число запросов зависеть не должно
+        self.grow = lambda: add_sample_items(self.resume, self.grow_items, start=100)
+        self.assertQueryBudget(13, 'get', reverse('resume:export_archive'), {'format': 'docx'})
+
+
+class ResumeSectionsQueryBudgetTest(QueryBudgetTestCase):
+    """Бюджет запросов маршрутов секций: api/resumes/<resume_id>/<секция>/"""
+
+    # Имя маршрута: модель, данные запроса, поля для создания элемента в prepare
+    sections = {
+        'education': (Education, {
+            'institution': 'КГТУ', 'degree': 'Магистр', 'field_of_study': 'Информатика',
+            'start_date': '2020-09-01', 'end_date': '2022-06-30'
+        }, {'institution': 'КГТУ', 'degree': 'Магистр', 'field_of_study': 'Информатика',
+            'start_date': date(2020, 9, 1)}),
+        'work-experience': (WorkExperience, {
+            'company': 'ООО Ромашка', 'position': 'Разработчик', 'start_date': '2022-07-01', 'is_current': True
+        }, {'company': 'ООО Ромашка', 'position': 'Разработчик', 'start_date': date(2022, 7, 1), 'is_current': True}),
+        'skill': (Skill, {'name': 'Python', 'level': 'expert', 'category': 'technical'}, {'name': 'Python'}),
+        'achievement': (Achievement, {'title': 'Хакатон', 'date': '2023-05-01'}, {'title': 'Хакатон'}),
+        'language': (Language, {'language': 'Английский', 'proficiency_level': 'B2'}, {'language': 'Английский'}),
+    }
+
+    def test_sections(self):
+        for name, (model, data, fields) in self.sections.items():
+            with self.subTest(section=name):
+                list_url = reverse(f'{name}-list', args=[self.resume.pk])
+
+                def new_item():
+                    return model.objects.create(resume=self.resume, **fields)
+
+                def detail_url(item):
+                    return reverse(f'{name}-detail', args=[self.resume.pk, item.pk])
+
+                self.assertQueryBudget(2, 'get', list_url)
+                self.assertQueryBudget(3, 'post', list_url, data, status_code=201)
+                self.assertQueryBudget(2, 'get', detail_url, prepare=new_item)
+                self.assertQueryBudget(4, 'put', detail_url, data, prepare=new_item)
+                # Валидация опыта работы требует is_current или end_date и при частичном обновлении
+                patch = {'order': 5, 'is_current': True} if model is WorkExperience else {'order': 5}
+                self.assertQueryBudget(4, 'patch', detail_url, patch, prepare=new_item)
+                self.assertQueryBudget(4, 'delete', detail_url, status_code=204, prepare=new_item)
+
+
+class ExportJobMaintenanceTest(TestCase):
+    """Брошенные и устаревшие задачи экспорта"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+
+    def make_job(self, status, age, content=None):
+        job = ExportJob.objects.create(resume=self.resume, user=self.user, export_format='pdf', status=status)
+        if content is not None:
+            job.file.save(f'{job.pk}.pdf', ContentFile(content))
+        moment = timezone.now() - timedelta(seconds=age)
+        ExportJob.objects.filter(pk=job.pk).update(created_at=moment, started_at=moment, finished_at=moment)
+        return job
+
+    @override_settings(EXPORT_JOBS={'RUNNING_TIMEOUT': 60})
+    def test_stale_running_job(self):
+        running = self.make_job(ExportJob.STATUS_RUNNING, 30)
+        self.assertEqual(enqueue_export(self.resume, 'pdf', self.user), running)
+
+        ExportJob.objects.filter(pk=running.pk).update(started_at=timezone.now() - timedelta(seconds=120))
+        job = enqueue_export(self.resume, 'pdf', self.user)
+        self.assertNotEqual(job, running)
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        running.refresh_from_db()
+        self.assertEqual(running.status, ExportJob.STATUS_FAILED)
+        self.assertIsNotNone(running.finished_at)
+
+    @override_settings(EXPORT_JOBS={'RUNNING_TIMEOUT': 60})
+    def test_orphaned_pending_job(self):
+        # Задача осталась в очереди пула потоков остановленного процесса
+        orphaned = self.make_job(ExportJob.STATUS_PENDING, 120)
+        job = enqueue_export(self.resume, 'pdf', self.user)
+        self.assertNotEqual(job, orphaned)
+        self.assertEqual(enqueue_export(self.resume, 'pdf', self.user), job)
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        orphaned.refresh_from_db()
+        self.assertEqual(orphaned.status, ExportJob.STATUS_FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+
+    @override_settings(EXPORT_JOBS={'BACKEND': 'db', 'RUNNING_TIMEOUT': 60})
+    def test_pending_jobs_wait_for_db_worker(self):
+        waiting = self.make_job(ExportJob.STATUS_PENDING, 120)
+        self.assertEqual(fail_stale_jobs(), 0)
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, ExportJob.STATUS_PENDING)
+
+    @override_settings(EXPORT_JOBS={'RUNNING_TIMEOUT': 60})
+    def test_new_executor_resubmits_pending_jobs(self):
+        orphaned = self.make_job(ExportJob.STATUS_PENDING, 120)
+        recent = self.make_job(ExportJob.STATUS_PENDING, 10)
+        with mock.patch.object(export_jobs, '_executor', None), \
+                mock.patch.object(export_jobs, 'ThreadPoolExecutor') as executor_class:
+            export_jobs._get_executor()
+        executor_class.return_value.submit.assert_called_once_with(export_jobs._run_in_thread, recent.pk)
+        orphaned.refresh_from_db()
+        self.assertEqual(orphaned.status, ExportJob.STATUS_FAILED)
+
+    @override_settings(EXPORT_JOBS={'RESULT_TTL': 3600})
+    def test_expired_jobs_are_deleted_with_files(self):
+        expired = self.make_job(ExportJob.STATUS_DONE, 7200, content=b'pdf')
+        path = expired.file.path
+        fresh = self.make_job(ExportJob.STATUS_DONE, 60)
+        running = self.make_job(ExportJob.STATUS_RUNNING, 7200)
+
+        self.assertEqual(delete_expired_jobs(), 1)
+        self.assertFalse(ExportJob.objects.filter(pk=expired.pk).exists())
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(set(ExportJob.objects.values_list('pk', flat=True)), {fresh.pk, running.pk})
+
+
+class TemplateChangeThumbnailsTest(TestCase):
+    """Изменение шаблона и превью резюме"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        self.template = Template.objects.create(
+            name='Классический', html_structure='<h1>{{full_name}}</h1>', css_styles='h1 {}', created_by=user
+        )
+        self.resumes = [
+            Resume.objects.create(user=user, template=self.template, title=f'Резюме {i}', thumbnail_key='key')
+            for i in range(3)
+        ]
+
+    def stale_count(self):
+        return Resume.objects.filter(thumbnail_key=STALE_THUMBNAIL_KEY).count()
+
+    def test_name_change_keeps_thumbnails(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.template.name = 'Новое название'
+            self.template.save()
+            self.template.css_styles = 'h1 { color: red; }'
+            self.template.save(update_fields=['name'])
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.stale_count(), 0)
+
+    @override_settings(EXPORT_JOBS={'BACKEND': 'db'})
+    def test_layout_change_marks_thumbnails_stale(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.template.css_styles = 'h1 { color: red; }'
+            self.template.save()
+        # Перерисовку выполнит run_export_worker, а не очередь веб-процесса
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.stale_count(), len(self.resumes))
+
+    @override_settings(EXPORT_JOBS={'BACKEND': 'thread'})
+    def test_layout_change_drains_stale_thumbnails_without_worker(self):
+        refreshed = []
+
+        def generate(resume_id):
+            refreshed.append(resume_id)
+            Resume.objects.filter(pk=resume_id).update(thumbnail_key='new')
+
+        with mock.patch('resume.thumbnails.generate_thumbnail', side_effect=generate), \
+                mock.patch.object(thumbnails._queue, '_get_executor', return_value=ImmediateExecutor()):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.template.css_styles = 'h1 { color: red; }'
+                self.template.save()
+                self.template.html_structure = '<h2>{{full_name}}</h2>'
+                self.template.save()
+        # Два изменения подряд - каждое превью перерисовано один раз
+        self.assertEqual(refreshed, [resume.pk for resume in self.resumes])
+        self.assertEqual(self.stale_count(), 0)
+
+
+class ImmediateExecutor:
+    """Выполняет задачу сразу, в вызывающем потоке"""
+
+    def submit(self, func, *args):
+        func(*args)
+
+
+class ResumeTaskQueueTest(TestCase):
+    """Схлопывание и отложенный запуск фоновых задач по резюме"""
+
+    def test_delay_coalesces_repeated_schedules(self):
+        calls = []
+        done = threading.Event()
+
+        def func(resume_id):
+            calls.append(resume_id)
+            done.set()
+
+        queue = ResumeTaskQueue('test-queue', func)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                queue.schedule(1, delay=0.2)
+            queue.schedule(2)
+        self.assertTrue(done.wait(5))
+        done.clear()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(calls, [2, 1])
+
+
+class ExportPhotoTest(TestCase):
+    """Фото в HTML экспорта, когда уменьшенной копии нет"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        template = Template.objects.create(
+            name='С фото', created_by=user, css_styles='img {}',
+            html_structure='<p>{{#if photo}}<img src="{{photo}}">{{else}}без фото{{/if}}</p>'
+        )
+        self.resume = Resume.objects.create(
+            user=user, template=template, title='Резюме', photo='resumes/photos/missing.png'
+        )
+
+    def test_missing_file_uses_else_branch(self):
+        html = generate_html_from_template(self.resume)
+        self.assertIn('без фото', html)
+        self.assertNotIn('<img', html)
+
+    def test_rendition_error_is_logged(self):
+        with mock.patch('resume.export_utils.get_photo_url', side_effect=OSError('broken image')), \
+                self.assertLogs('resume.export_utils', 'WARNING'):
+            html = generate_html_from_template(self.resume)
+        self.assertIn('без фото', html)
+
+
+class TemplateCompilerTest(TestCase):
+    """Разбор блоков {{#if}} в HTML шаблона"""
+
+    def test_if_else(self):
+        compiled = compile_template_source('<p>{{#if photo}}фото{{else}}нет{{/if}} {{full_name}}</p>')
+        self.assertEqual(compiled.render({'full_name': 'Иван'}, ['photo']), '<p>фото Иван</p>')
+        self.assertEqual(compiled.render({'full_name': 'Иван'}), '<p>нет Иван</p>')
+
+    def test_unclosed_block_is_literal(self):
+        # Как и неизвестные теги, незакрытый блок остаётся в тексте, а плейсхолдеры внутри подставляются
+        compiled = compile_template_source('<p>{{#if photo}}{{full_name}}{{else}}{{#if photo}}x{{/if}}</p>')
+        self.assertEqual(compiled.render({'full_name': 'Иван'}), '<p>{{#if photo}}Иван{{else}}</p>')
+        self.assertEqual(compiled.render({'full_name': 'Иван'}, ['photo']), '<p>{{#if photo}}Иван{{else}}x</p>')
+
+
+class RenderPoolConfigTest(TestCase):
+    """Размер пула WeasyPrint на один WSGI-воркер"""
+
+    @override_settings(PDF_RENDER_POOL={})
+    def test_default_size(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': ''}):
+            self.assertEqual(get_render_pool_config()['SIZE'], 2)
+        with mock.patch('os.cpu_count', return_value=16), mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual(get_render_pool_config()['SIZE'], 4)
+        with mock.patch('os.cpu_count', return_value=2), mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '8'}):
+            self.assertEqual(get_render_pool_config()['SIZE'], 1)
+
+    @override_settings(PDF_RENDER_POOL={'SIZE': 3})
+    def test_explicit_size(self):
+        self.assertEqual(get_render_pool_config()['SIZE'], 3)
+
+
+class RendererPoolTimeoutTest(TestCase):
+    """Зависший рендер не занимает процесс пула навсегда"""
+
+    def test_timeout_kills_pool(self):
+        pool = RendererPool(size=1, max_renders=10, timeout=0.5)
+        self.addCleanup(pool.shutdown, kill=True)
+        executor = pool._get_executor()
+        hung = executor.submit(time.sleep, 60)
+        process, = executor._processes.values()
+
+        with self.assertRaises(FutureTimeoutError), self.assertLogs('resume.render_pool', 'WARNING'):
+            pool.render('<p>PDF</p>')
+        process.join(5)
+        self.assertFalse(process.is_alive())
+        self.assertTrue(hung.done())
+        self.assertIsNot(pool._get_executor(), executor)
@@ -0,0 +1,151 @@
+import logging
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from .models import Resume
+from .loaders import load_resume_for_export
+from .export_cache import build_cache_key
+from .export_utils import export_resume
+from .background import ResumeTaskQueue
+from .export_jobs import get_jobs_config
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_EXTENSIONS = {
+    'WEBP': 'webp',
+    'PNG': 'png',
+}
+
+
+def get_thumbnails_config():
+    """Настройки превью резюме из settings.RESUME_THUMBNAILS"""
+    config = getattr(settings, 'RESUME_THUMBNAILS', {})
+    return {
+        'ENABLED': config.get('ENABLED', True),
+        'WIDTH': config.get('WIDTH', 320),
+        'FORMAT': config.get('FORMAT', 'WEBP').upper(),
+        'QUALITY': config.get('QUALITY', 80),
+        # Сек после последнего изменения резюме до перерисовки превью
+        'DELAY': config.get('DELAY', 10),
+    }
+
+
+def rasterize_first_page(pdf_bytes, width):
+    """Первая страница PDF в виде изображения PIL заданной ширины"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        page = pdf[0]
+        image = page.render(scale=width / page.get_width()).to_pil()
+        page.close()
+    finally:
+        pdf.close()
+    return image
+
+
+def generate_thumbnail(resume_id):
+    """
+    Перегенерировать превью резюме, если его содержимое изменилось.
+    Ключ превью совпадает с ключом кэша PDF, поэтому PDF для превью
+    чаще всего уже лежит в кэше экспорта и повторно не рендерится
+    """
+    try:
+        resume = load_resume_for_export('pdf', pk=resume_id)
+    except Resume.DoesNotExist:
+        return None
+
+    key = build_cache_key(resume, 'pdf')
+    if resume.thumbnail and resume.thumbnail_key == key:
+        return resume.thumbnail.name
+
+    config = get_thumbnails_config()
+    content, _ = export_resume(resume, 'pdf')
+    image = rasterize_first_page(content, config['WIDTH'])
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    buffer = BytesIO()
+    image.save(buffer, format=config['FORMAT'], quality=config['QUALITY'])
+
+    # Ключ в имени файла делает URL версионным: при изменении резюме меняется
+    # адрес, поэтому файл можно отдавать с долгим временем кэширования
+    extension = THUMBNAIL_EXTENSIONS.get(config['FORMAT'], config['FORMAT'].lower())
+    name = default_storage.save(
+        f'resumes/thumbnails/{resume.pk}_{key[:16]}.{extension}',
+        ContentFile(buffer.getvalue())
+    )
+
+    # update() не трогает updated_at и не вызывает сигналы сохранения резюме
+    old_name = resume.thumbnail.name if resume.thumbnail else ''
+    Resume.objects.filter(pk=resume.pk).update(thumbnail=name, thumbnail_key=key)
+    if old_name and old_name != name:
+        default_storage.delete(old_name)
+    return name
+
+
+# pdfium не потокобезопасен, поэтому превью генерируются в одном потоке
+_queue = ResumeTaskQueue('resume-thumbnail', generate_thumbnail)
+
+
+def schedule_thumbnail(resume_id):
+    """
+    Поставить перегенерацию превью в очередь после фиксации транзакции.
+    Серия сохранений в редакторе даёт одну перерисовку через DELAY после последнего
+    """
+    config = get_thumbnails_config()
+    if not config['ENABLED']:
+        return
+    _queue.schedule(resume_id, delay=config['DELAY'])
+
+
+# thumbnail_key превью, которые перерисовывает воркер экспорта, а не очередь веб-процесса
+STALE_THUMBNAIL_KEY = 'stale'
+
+
+def mark_thumbnails_stale(queryset):
+    """
+    Пометить превью резюме устаревшими. Массовая перерисовка (например, после
+    изменения вёрстки шаблона) выполняется в run_export_worker, а с BACKEND = 'thread',
+    где воркера нет, - по одному резюме в потоке очереди превью. Возвращает число резюме
+    """
+    if not get_thumbnails_config()['ENABLED']:
+        return 0
+    marked = queryset.update(thumbnail_key=STALE_THUMBNAIL_KEY)
+    if marked and get_jobs_config()['BACKEND'] == 'thread':
+        _queue.schedule_call(STALE_THUMBNAIL_KEY, drain_stale_thumbnails)
+    return marked
+
+
+def refresh_stale_thumbnails(limit, after=0):
+    """
+    Перерисовать до limit устаревших превью резюме с pk больше after.
+    Возвращает pk последнего обработанного резюме или None, если таких больше нет;
+    превью, которое не удалось перерисовать, остаётся устаревшим до следующего прохода
+    """
+    if not get_thumbnails_config()['ENABLED']:
+        return None
+    resume_ids = list(
+        Resume.objects.filter(thumbnail_key=STALE_THUMBNAIL_KEY, pk__gt=after)
+        .order_by('pk').values_list('pk', flat=True)[:limit]
+    )
+    for resume_id in resume_ids:
+        try:
+            generate_thumbnail(resume_id)
+        except Exception:
+            logger.exception('Thumbnail for resume %s failed', resume_id)
+    return resume_ids[-1] if resume_ids else None
+
+
+def drain_stale_thumbnails(batch=10):
+    """Перерисовать все устаревшие превью партиями по batch"""
+    cursor = 0
+    while cursor is not None:
+        cursor = refresh_stale_thumbnails(batch, cursor)
+
+
+def delete_thumbnail(name):
+    """Удалить файл превью из хранилища"""
+    if name:
+        default_storage.delete(name)
@@ -15,6 +15,10 @@ from .views import (
 from .export_views import (
     ResumeExportPDFView,
     ResumeExportDOCXView,
+    ResumeExportJobCreateView,
+    ResumeExportJobStatusView,
+    ResumeExportJobDownloadView,
+    ResumeExportArchiveView,
 )
 from .photo_views import (
     ResumePhotoUploadView,
@@ -50,4 +54,12 @@ urlpatterns = [
     # Экспорт
     path('<int:pk>/export/pdf/', ResumeExportPDFView.as_view(), name='export_pdf'),
     path('<int:pk>/export/docx/', ResumeExportDOCXView.as_view(), name='export_docx'),
+    
+    # Фоновый экспорт через очередь задач
+    path('<int:pk>/export/jobs/', ResumeExportJobCreateView.as_view(), name='export_job_create'),
+    path('export/jobs/<uuid:job_id>/', ResumeExportJobStatusView.as_view(), name='export_job_status'),
+    path('export/jobs/<uuid:job_id>/download/', ResumeExportJobDownloadView.as_view(), name='export_job_download'),
+    
+    # Все резюме пользователя одним архивом
+    path('export/archive/', ResumeExportArchiveView.as_view(), name='export_archive'),
 ]
\ No newline at end of file
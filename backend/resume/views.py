@@ -1,11 +1,26 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView  # ← Убедитесь что это есть
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.template.loader import render_to_string
 from .models import Resume
+from personalinfo.models import PersonalInfo
+from education.models import Education
+from workexperlence.models import WorkExperience
+from skill.models import Skill
+from achievement.models import Achievement
+from language.models import Language
+from template.models import Template
+from .loaders import SECTION_RELATIONS, detail_queryset, prefetch_detail
+from .conditional import make_etag, not_modified_response, set_etag
+from resumebuilder.pagination import PageNumberOrKeysetPagination
+from .snapshots import get_snapshot
+from .fast_serializers import resume_list_serializer, resume_detail_serializer
 from .serializers import (
     ResumeListSerializer,
     ResumeDetailSerializer,
@@ -13,6 +28,47 @@ from .serializers import (
 )
 
 
+# Секции, которые можно запросить через ?include=
+INCLUDE_SECTIONS = ('personal_info',) + SECTION_RELATIONS
+
+
+def _split_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_requested_keys(request):
+    """
+    Ключи ответа по параметрам ?fields= и ?include=.
+    fields - поля ответа (в т.ч. секции), include - секции в дополнение к полям.
+    Только include - все поля без секций плюс перечисленные секции.
+    Возвращает (ключи или None для полного ответа, список неизвестных имён)
+    """
+    fields = _split_param(request, 'fields')
+    include = _split_param(request, 'include')
+    if fields is None and include is None:
+        return None, []
+
+    available = ResumeDetailSerializer.Meta.fields
+    if fields is None:
+        fields = [name for name in available if name not in INCLUDE_SECTIONS]
+    unknown = [name for name in fields if name not in available]
+    unknown += [name for name in include or [] if name not in INCLUDE_SECTIONS]
+
+    requested = set(fields) | set(include or [])
+    return [name for name in available if name in requested], unknown
+
+
+def fields_error_response(unknown):
+    return Response({
+        'error': f'Неизвестные поля: {", ".join(unknown)}',
+        'available_fields': ResumeDetailSerializer.Meta.fields,
+        'available_sections': INCLUDE_SECTIONS
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
 class ResumeListView(generics.ListAPIView):
     """Список всех резюме текущего пользователя"""
     serializer_class = ResumeListSerializer
@@ -22,9 +78,24 @@ class ResumeListView(generics.ListAPIView):
     search_fields = ['title']
     ordering_fields = ['created_at', 'updated_at', 'title']
     ordering = ['-updated_at']
+    # ?pagination=cursor - курсорная пагинация по (updated_at, id) или (created_at, id)
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering_fields = ('updated_at', 'created_at')
 
     def get_queryset(self):
-        return Resume.objects.filter(user=self.request.user)
+        # Шаблон и личная информация в том же запросе, заполненность - по счётчикам
+        # секций в строке резюме: число запросов не зависит от размера страницы
+        return Resume.objects.filter(user=self.request.user).select_related(
+            'template', 'personal_info'
+        )
+
+    def list(self, request, *args, **kwargs):
+        """Страница списка через скомпилированный сериализатор: та же форма ответа, меньше накладных расходов DRF"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(resume_list_serializer.many(page, request))
+        return Response(resume_list_serializer.many(queryset, request))
 
 
 class ResumeCreateView(generics.CreateAPIView):
@@ -39,7 +110,7 @@ class ResumeCreateView(generics.CreateAPIView):
         
         return Response({
             'message': 'Резюме успешно создано',
-            'resume': ResumeDetailSerializer(resume).data
+            'resume': resume_detail_serializer.to_representation(prefetch_detail(resume))
         }, status=status.HTTP_201_CREATED)
 
 
@@ -49,10 +120,34 @@ class ResumeDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Resume.objects.filter(user=self.request.user)
-    
-    # ← ДОБАВЬТЕ ЭТОТ МЕТОД
-    
+        return detail_queryset().filter(user=self.request.user)
+
+    def get(self, request, pk):
+        """
+        Ответ из снимка резюме: один запрос по первичному ключу.
+        ?fields= и ?include= ограничивают поля и секции ответа
+        """
+        keys, unknown = get_requested_keys(request)
+        if unknown:
+            return fields_error_response(unknown)
+        snapshot = get_snapshot(pk, keys=keys, user=request.user)
+        if snapshot is None:
+            raise Http404
+        
+        # ETag по ревизии резюме и версии шаблона. Ссылка на фото в ответе абсолютная и зависит от хоста
+        etag = make_etag(
+            'detail', pk, snapshot['revision'], snapshot['views_count'],
+            snapshot['template_id'], snapshot['template__updated_at'], request.get_host(), keys,
+            request.accepted_renderer.format
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        data = snapshot['data']
+        if data.get('photo'):
+            data['photo'] = request.build_absolute_uri(data['photo'])
+        return set_etag(Response(data), etag)
 
 
 class ResumePreviewView(APIView):
@@ -60,24 +155,28 @@ class ResumePreviewView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, pk):
-        resume = get_object_or_404(Resume, pk=pk, user=request.user)
+        snapshot = get_snapshot(pk, user=request.user)
+        if snapshot is None:
+            raise Http404
         # resume.increment_views()   Увеличиваем счетчик просмотров при предпросмотре
         
         # Проверяем наличие шаблона
-        if not resume.template:
+        if not snapshot['template_id']:
             return Response({
                 'error': 'Для резюме не выбран шаблон'
             }, status=status.HTTP_400_BAD_REQUEST)
+        template = Template.objects.only('html_structure', 'css_styles').get(pk=snapshot['template_id'])
         
-        # Получаем все связанные данные
+        # Данные берутся из снимка резюме, без запросов к секциям
+        data = snapshot['data']
         context = {
-            'resume': resume,
-            'personal_info': getattr(resume, 'personal_info', None),
-            'education': resume.education.all(),
-            'work_experience': resume.work_experience.all(),
-            'skills': resume.skills.all(),
-            'achievements': resume.achievements.all(),
-            'languages': resume.languages.all(),
+            'resume': data,
+            'personal_info': data['personal_info'],
+            'education': data['education'],
+            'work_experience': data['work_experience'],
+            'skills': data['skills'],
+            'achievements': data['achievements'],
+            'languages': data['languages'],
         }
         
         # Формируем HTML с данными
@@ -87,9 +186,9 @@ class ResumePreviewView(APIView):
             
             return Response({
                 'html': html_with_data,
-                'css': resume.template.css_styles,
-                'template_html': resume.template.html_structure,
-                'data': ResumeDetailSerializer(resume).data
+                'css': template.css_styles,
+                'template_html': template.html_structure,
+                'data': data
             })
         except Exception as e:
             return Response({
@@ -114,7 +213,7 @@ class ResumeUpdateView(generics.UpdateAPIView):
         
         return Response({
             'message': 'Резюме успешно обновлено',
-            'resume': ResumeDetailSerializer(instance).data
+            'resume': resume_detail_serializer.to_representation(prefetch_detail(instance))
         })
 
 
@@ -145,37 +244,14 @@ class ResumeCopyView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        original_resume = get_object_or_404(Resume, pk=pk, user=request.user)
-        
-        # Создаем копию резюме
-        new_resume = Resume.objects.create(
-            user=request.user,
-            template=original_resume.template,
-            title=f"{original_resume.title} (копия)",
-            photo=original_resume.photo,
-            is_primary=False
+        original_resume = get_object_or_404(
+            Resume.objects.select_related('template', 'personal_info'), pk=pk, user=request.user
         )
         
-        # Копируем личную информацию
-        if hasattr(original_resume, 'personal_info'):
-            original_info = original_resume.personal_info
-            from personalinfo.models import PersonalInfo
-            PersonalInfo.objects.create(
-                resume=new_resume,
-                full_name=original_info.full_name,
-                phone=original_info.phone,
-                email=original_info.email,
-                address=original_info.address,
-                linkedin=original_info.linkedin,
-                website=original_info.website,
-                summary=original_info.summary
-            )
-        
-        # Копируем образование
-        for edu in original_resume.education.all():
-            from education.models import Education
-            Education.objects.create(
-                resume=new_resume,
+        # Копии секций создаются пачками (bulk_create не вызывает сигналы),
+        # поэтому счётчики секций новому резюме задаются сразу
+        education = [
+            Education(
                 institution=edu.institution,
                 degree=edu.degree,
                 field_of_study=edu.field_of_study,
@@ -184,12 +260,10 @@ class ResumeCopyView(APIView):
                 description=edu.description,
                 order=edu.order
             )
-        
-        # Копируем опыт работы
-        for work in original_resume.work_experience.all():
-            from workexperlence.models import WorkExperience
-            WorkExperience.objects.create(
-                resume=new_resume,
+            for edu in original_resume.education.all()
+        ]
+        work_experience = [
+            WorkExperience(
                 company=work.company,
                 position=work.position,
                 start_date=work.start_date,
@@ -198,42 +272,80 @@ class ResumeCopyView(APIView):
                 description=work.description,
                 order=work.order
             )
-        
-        # Копируем навыки
-        for skill in original_resume.skills.all():
-            from skill.models import Skill
-            Skill.objects.create(
-                resume=new_resume,
+            for work in original_resume.work_experience.all()
+        ]
+        skills = [
+            Skill(
                 name=skill.name,
                 level=skill.level,
                 category=skill.category,
                 order=skill.order
             )
-        
-        # Копируем достижения
-        for achievement in original_resume.achievements.all():
-            from achievement.models import Achievement
-            Achievement.objects.create(
-                resume=new_resume,
+            for skill in original_resume.skills.all()
+        ]
+        achievements = [
+            Achievement(
                 title=achievement.title,
                 description=achievement.description,
                 date=achievement.date,
                 order=achievement.order
             )
-        
-        # Копируем языки
-        for lang in original_resume.languages.all():
-            from language.models import Language
-            Language.objects.create(
-                resume=new_resume,
+            for achievement in original_resume.achievements.all()
+        ]
+        languages = [
+            Language(
                 language=lang.language,
                 proficiency_level=lang.proficiency_level,
                 order=lang.order
             )
+            for lang in original_resume.languages.all()
+        ]
+        
+        # Превью ставится в очередь после фиксации транзакции, когда все секции уже скопированы
+        with transaction.atomic():
+            # Создаем копию резюме
+            new_resume = Resume.objects.create(
+                user=request.user,
+                template=original_resume.template,
+                title=f"{original_resume.title} (копия)",
+                photo=original_resume.photo,
+                is_primary=False,
+                education_count=len(education),
+                work_experience_count=len(work_experience),
+                skills_count=len(skills),
+                achievements_count=len(achievements),
+                languages_count=len(languages)
+            )
+            
+            # Копируем личную информацию
+            if hasattr(original_resume, 'personal_info'):
+                original_info = original_resume.personal_info
+                PersonalInfo.objects.create(
+                    resume=new_resume,
+                    full_name=original_info.full_name,
+                    phone=original_info.phone,
+                    email=original_info.email,
+                    address=original_info.address,
+                    linkedin=original_info.linkedin,
+                    website=original_info.website,
+                    summary=original_info.summary
+                )
+            
+            # Копируем образование, опыт работы, навыки, достижения и языки
+            for model, items in (
+                (Education, education),
+                (WorkExperience, work_experience),
+                (Skill, skills),
+                (Achievement, achievements),
+                (Language, languages),
+            ):
+                for item in items:
+                    item.resume = new_resume
+                model.objects.bulk_create(items)
         
         return Response({
             'message': f'Резюме "{original_resume.title}" успешно скопировано',
-            'resume': ResumeDetailSerializer(new_resume).data
+            'resume': resume_detail_serializer.to_representation(prefetch_detail(new_resume))
         }, status=status.HTTP_201_CREATED)
 
 
@@ -245,7 +357,9 @@ class ResumeSetPrimaryView(APIView):
         resume = get_object_or_404(Resume, pk=pk, user=request.user)
         
         # Снимаем флаг is_primary со всех резюме пользователя
-        Resume.objects.filter(user=request.user).update(is_primary=False)
+        Resume.objects.filter(user=request.user, is_primary=True).exclude(pk=resume.pk).update(
+            is_primary=False, revision=F('revision') + 1
+        )
         
         # Устанавливаем текущее резюме как основное
         resume.is_primary = True
@@ -253,39 +367,9 @@ class ResumeSetPrimaryView(APIView):
         
         return Response({
             'message': f'Резюме "{resume.title}" установлено как основное',
-            'resume': ResumeListSerializer(resume).data
+            'resume': resume_list_serializer.to_representation(resume)
         })
-    # В конец файла backend/resume/views.py добавьте:
 
-class ResumePublicView(APIView):
-    """
-    Публичный просмотр резюме (без авторизации)
-    Увеличивает счетчик просмотров
-    """
-    permission_classes = [permissions.AllowAny]
-    
-    def get(self, request, pk):
-        """Получить резюме и увеличить счетчик просмотров"""
-        try:
-            resume = Resume.objects.get(pk=pk)
-            
-            # Увеличиваем счетчик просмотров
-            # Можно добавить проверку, чтобы не считать просмотры владельца
-            if not request.user.is_authenticated or request.user != resume.user:
-                resume.increment_views()
-            
-            serializer = ResumeDetailSerializer(resume)
-            return Response(serializer.data)
-            
-        except Resume.DoesNotExist:
-            return Response({
-                'error': 'Резюме не найдено'
-            }, status=status.HTTP_404_NOT_FOUND)
-
-
-# ... весь существующий код views.py
-
-# В КОНЕЦ ФАЙЛА ДОБАВЬТЕ:
 
 class ResumePublicView(APIView):
     """
@@ -295,22 +379,36 @@ class ResumePublicView(APIView):
     permission_classes = [permissions.AllowAny]
     
     def get(self, request, pk):
-        """Получить резюме и увеличить счетчик просмотров"""
-        try:
-            resume = Resume.objects.get(pk=pk)
-            
-            # Увеличиваем счетчик просмотров
-            # Не считаем просмотры владельца
-            if not request.user.is_authenticated or request.user != resume.user:
-                resume.increment_views()
-            
-            serializer = ResumeDetailSerializer(resume)
-            return Response(serializer.data)
-            
-        except Resume.DoesNotExist:
+        """
+        Получить резюме и увеличить счетчик просмотров.
+        ?fields= и ?include= ограничивают поля и секции ответа
+        """
+        keys, unknown = get_requested_keys(request)
+        if unknown:
+            return fields_error_response(unknown)
+        snapshot = get_snapshot(pk, keys=keys)
+        if snapshot is None:
             return Response({
                 'error': 'Резюме не найдено'
             }, status=status.HTTP_404_NOT_FOUND)
+        
+        # Увеличиваем счетчик просмотров
+        # Не считаем просмотры владельца. Просмотр засчитывается и при ответе 304
+        if not request.user.is_authenticated or request.user.pk != snapshot['user_id']:
+            Resume.objects.filter(pk=pk).update(views_count=F('views_count') + 1)
+            if 'views_count' in snapshot['data']:
+                snapshot['data']['views_count'] += 1
+        
+        # Счетчик меняется при каждом просмотре, поэтому ETag слабый и от него не зависит
+        etag = make_etag(
+            'public', pk, snapshot['revision'], snapshot['template_id'], snapshot['template__updated_at'],
+            keys, request.accepted_renderer.format, weak=True
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        return set_etag(Response(snapshot['data']), etag)
 
 
 class ResumeViewsStatsView(APIView):
@@ -0,0 +1,128 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по паре (поле времени, id).
+    Страница выбирается условием по индексу вместо OFFSET, COUNT(*) не выполняется,
+    поэтому время ответа не зависит от глубины страницы.
+    Поля, по которым разрешена сортировка, задаются во view через cursor_ordering_fields
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering_fields = ('created_at',)
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_ordering_fields(self, view):
+        return getattr(view, 'cursor_ordering_fields', self.ordering_fields)
+
+    def get_ordering(self, request, view):
+        """Поле и направление сортировки из ?ordering= или сортировки view по умолчанию"""
+        fields = self.get_ordering_fields(view)
+        candidates = [request.query_params.get(api_settings.ORDERING_PARAM, '').split(',')[0].strip()]
+        candidates += list(getattr(view, 'ordering', None) or [])
+        for ordering in candidates:
+            if ordering.lstrip('-') in fields:
+                return ordering.lstrip('-'), ordering.startswith('-')
+        return fields[0], True
+
+    def encode_cursor(self, instance, reverse):
+        value = self.model_field.value_to_string(instance)
+        payload = [self.field, self.descending, value, instance.pk, reverse]
+        token = urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, view, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            field, descending, value, pk, reverse = json.loads(urlsafe_b64decode(token.encode('ascii')))
+            if field not in self.get_ordering_fields(view):
+                raise ValueError(field)
+            value = model._meta.get_field(field).to_python(value)
+            return field, bool(descending), value, int(pk), bool(reverse)
+        except (TypeError, ValueError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request, view, queryset.model)
+        if cursor is None:
+            self.field, self.descending = self.get_ordering(request, view)
+            value = pk = None
+            reverse = False
+        else:
+            self.field, self.descending, value, pk, reverse = cursor
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        # Страница «назад» выбирается в обратном порядке и затем разворачивается
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+        if cursor is not None:
+            # Строки после курсора: (field, pk) < (value, pk). Условие field <= value
+            # отдельно от OR, чтобы PostgreSQL сканировал диапазон индекса
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}e': value}),
+                Q(**{f'{self.field}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else cursor is not None
+        has_previous = has_more if reverse else cursor is not None
+        self.next_link = self.encode_cursor(results[-1], False) if has_next and results else None
+        if has_previous and results:
+            self.previous_link = self.encode_cursor(results[0], True)
+        elif has_previous:
+            self.previous_link = remove_query_param(self.base_url, self.cursor_query_param)
+        else:
+            self.previous_link = None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data)
+        ]))
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию; ?pagination=cursor включает
+    курсорную пагинацию KeysetPagination. Ссылки next/previous курсорного
+    режима сохраняют параметр, поэтому режим не сбрасывается при переходах
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (request.query_params.get(self.mode_query_param) == self.cursor_mode
+                or self.keyset_pagination_class.cursor_query_param in request.query_params):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,47 @@
+import codecs
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils import json
+from .renderers import ORJSONRenderer, MessagePackRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser на orjson.
+    Тело, которое orjson не принял, разбирается стандартным json:
+    так сохраняются сообщения об ошибках DRF и разбор редких случаев
+    вроде суррогатных пар в \\u-последовательностях
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        content = stream.read()
+        if codecs.lookup(encoding).name == 'utf-8':
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(content.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """Разбор тела запроса в MessagePack (Content-Type: application/msgpack)"""
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % (str(exc) or type(exc).__name__))
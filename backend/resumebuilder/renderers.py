@@ -0,0 +1,72 @@
+import msgpack
+import orjson
+from collections.abc import Mapping
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _has_unsafe_float(value):
+    """
+    Есть ли в данных float, который orjson запишет не так, как json:
+    NaN и бесконечность (orjson пишет null, json с STRICT_JSON - ошибка)
+    и числа в экспоненциальной записи (1e16 вместо 1e+16)
+    """
+    if isinstance(value, float):
+        text = repr(value)
+        return 'e' in text or 'n' in text
+    if isinstance(value, Mapping):
+        return any(_has_unsafe_float(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_unsafe_float(item) for item in value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson.
+    Ответ совпадает с JSONRenderer побайтно: даты и время, Decimal,
+    ленивые строки и прочие нестандартные типы сериализуются кодировщиком DRF.
+    Отступы (Browsable API, ?indent=), float, которые orjson записывает иначе,
+    и всё, что orjson не умеет, уходят в JSONRenderer
+    """
+    # Даты и время форматирует кодировщик DRF ('+00:00' -> 'Z'),
+    # dataclass-объекты DRF не сериализует - orjson не должен тоже
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii or _has_unsafe_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Целые больше 64 бит, нестроковые ключи словарей и ошибки кодировщика
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как и JSONRenderer, экранируем U+2028 и U+2029 для совместимости с JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Ответы в MessagePack для клиентов с Accept: application/msgpack.
+    Типы, которых нет в MessagePack (даты, Decimal, ленивые строки),
+    преобразуются кодировщиком DRF, поэтому после распаковки данные
+    совпадают с разобранным JSON-ответом
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,8 +39,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Замер времени запроса: первым, чтобы учитывать SQL остальных middleware
+    "resumebuilder.timing.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    'corsheaders.middleware.CorsMiddleware',  # CORS должен быть вторым
+    'corsheaders.middleware.CorsMiddleware',  # CORS должен быть как можно выше
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -118,6 +121,86 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Дисковый кэш готовых файлов экспорта (PDF/DOCX)
+EXPORT_CACHE = {
+    'DIR': BASE_DIR / 'cache' / 'exports',
+    'MAX_SIZE': 512 * 1024 * 1024,  # 512MB, при превышении вытесняются давно использованные файлы
+}
+
+# Очередь фонового экспорта
+# BACKEND: 'thread' - пул потоков в процессе веб-сервера,
+#          'db' - задачи в БД, обработка через `python manage.py run_export_worker`
+EXPORT_JOBS = {
+    'BACKEND': 'thread',
+    'WORKERS': 2,
+    # сек; задача в работе дольше считается брошенной, с 'thread' - и задача в очереди дольше
+    'RUNNING_TIMEOUT': 600,
+    'RESULT_TTL': 24 * 3600,  # сек; потом задача и файл удаляются (run_export_worker или cleanup_export_jobs)
+}
+
+# Пул прогретых процессов WeasyPrint для генерации PDF
+PDF_RENDER_POOL = {
+    'ENABLED': True,
+    # Процессов на каждый WSGI-воркер (пул есть в каждом), а не на сервер.
+    # None - ядра делятся между воркерами по WEB_CONCURRENCY, без неё - 2
+    'SIZE': None,
+    'MAX_RENDERS_PER_PROCESS': 200,  # после стольких рендеров процесс перезапускается (Python 3.11+)
+    'TIMEOUT': 60,  # сек на один рендер; при превышении процессы пула перезапускаются
+}
+
+# Уменьшенные копии фотографий для PDF (подставляются по ссылке, а не base64)
+PHOTO_RENDITIONS = {
+    'DIR': BASE_DIR / 'cache' / 'photos',
+    'SIZE': 240,  # px по большей стороне
+    'QUALITY': 85,
+}
+
+# Превью первой страницы резюме для дашборда
+# Перегенерируются в фоне после изменения резюме, секций или шаблона
+RESUME_THUMBNAILS = {
+    'ENABLED': True,
+    'WIDTH': 320,  # px
+    'FORMAT': 'WEBP',  # WEBP или PNG
+    'QUALITY': 80,
+    'DELAY': 10,  # сек; перерисовка превью после последнего сохранения резюме подряд
+}
+
+# Экспорт всех резюме пользователя ZIP-архивом
+EXPORT_ARCHIVE = {
+    'WORKERS': 4,  # параллельных рендеров на один архив
+}
+
+# Замер времени запросов: заголовок Server-Timing (db, view, serialize, render,
+# export, total) и строка лога resumebuilder.timing (WARNING - медленные запросы,
+# INFO - каждый запрос, включается уровнем логгера в LOGGING). У потоковых ответов
+# заголовка нет, а время чтения тела попадает в лог метрикой stream
+REQUEST_TIMING = {
+    'ENABLED': True,
+    'HEADER': True,  # отдавать Server-Timing клиенту
+    'SLOW_REQUEST_MS': 500,  # медленнее - WARNING со списком самых долгих SQL; None - не выделять
+    'SLOWEST_QUERIES': 5,
+}
+# В manage.py test медленными бывают хеширование паролей и первые запросы - не засоряем вывод
+if sys.argv[1:2] == ['test']:
+    REQUEST_TIMING['SLOW_REQUEST_MS'] = None
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'resumebuilder.timing': {
+            'handlers': ['console'],
+            'level': 'WARNING',  # 'INFO' - строка на каждый запрос
+            'propagate': False,
+        },
+    },
+}
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -126,6 +209,20 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    # JSON через orjson; ответы совпадают с JSONRenderer/JSONParser DRF
+    # (данные, которые orjson записал бы иначе, рендерит сам JSONRenderer).
+    # MessagePack - для интеграций, запрашивающих Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': (
+        'resumebuilder.renderers.ORJSONRenderer',
+        'resumebuilder.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'resumebuilder.parsers.ORJSONParser',
+        'resumebuilder.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
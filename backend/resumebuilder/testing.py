@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from template.models import Template
+from resume.models import ExportJob
+from resume.sample_data import add_sample_items, create_sample_resume
+from resume.snapshots import build_snapshot
+
+PASSWORD = 'Password-123'
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Бюджет SQL-запросов на маршрут API.
+    assertQueryBudget выполняет запрос дважды: на исходных данных и после grow(),
+    которая добавляет данные во все таблицы. Число запросов не должно превышать
+    бюджет и не должно расти вместе с объёмом данных (N+1)
+    """
+    # Элементов в каждой секции резюме на старте и сколько добавляет grow()
+    items = 2
+    grow_items = 3
+
+    @classmethod
+    def setUpClass(cls):
+        # Файлы экспорта, фотографии и кэши пишутся во временный каталог
+        cls._media_root = tempfile.mkdtemp()
+        root = Path(cls._media_root)
+        cls._storage_settings = override_settings(
+            MEDIA_ROOT=root / 'media',
+            EXPORT_CACHE={'DIR': root / 'exports', 'MAX_SIZE': 64 * 1024 * 1024},
+            PHOTO_RENDITIONS={'DIR': root / 'photos', 'SIZE': 240, 'QUALITY': 85},
+            PDF_RENDER_POOL={'ENABLED': False},
+            EXPORT_ARCHIVE={'WORKERS': 1},
+        )
+        cls._storage_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._storage_settings.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password=PASSWORD)
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password=PASSWORD)
+        self.template = Template.objects.create(
+            name='Классический', description='Строгий шаблон',
+            html_structure='<h1>{{full_name}}</h1>{{education}}', css_styles='h1 {}', created_by=self.admin
+        )
+        self.resume = create_sample_resume(self.items, user=self.owner, template=self.template)
+        other = create_sample_resume(self.items, user=self.owner, template=self.template)
+        self.generation = 0
+        self.step = 0
+        self.refresh_snapshots(self.resume, other)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    @property
+    def grown_items(self):
+        """Элементов в секциях объектов, созданных в prepare() на текущем проходе"""
+        return self.items + self.step * self.grow_items
+
+    def refresh_snapshots(self, *resumes):
+        # В работе снимки пересобираются в фоне после фиксации транзакции;
+        # в тестах транзакция не фиксируется, поэтому снимки собираются явно
+        for resume in resumes:
+            build_snapshot(resume.pk)
+
+    def grow(self):
+        """Добавить пользователей, шаблоны, резюме, элементы секций и задачи экспорта"""
+        self.generation += 1
+        User = get_user_model()
+        created = [self.resume]
+        for i in range(self.grow_items):
+            suffix = f'{self.generation}-{i}'
+            user = User.objects.create_user(username=f'user-{suffix}', email=f'user-{suffix}@example.com')
+            template = Template.objects.create(
+                name=f'Шаблон {suffix}', html_structure='<h1>{{full_name}}</h1>', css_styles='', created_by=self.admin
+            )
+            created.append(create_sample_resume(self.items, user=user, template=template))
+            created.append(create_sample_resume(self.items, user=self.owner, template=template))
+            ExportJob.objects.create(resume=created[-1], user=self.owner, export_format='pdf')
+        add_sample_items(self.resume, self.grow_items, start=self.items + (self.generation - 1) * self.grow_items)
+        self.resume.refresh_from_db()
+        self.refresh_snapshots(*created)
+
+    def assertQueryBudget(self, budget, method, url, data=None, status_code=200, prepare=None, format='json'):
+        """
+        Проверить число запросов маршрута.
+        url и data могут быть функциями: с prepare они получают его результат, так маршруты,
+        которые удаляют или изменяют объект, получают новый объект на каждом проходе.
+        На втором проходе prepare вызывается после grow() и создаёт объект с self.grown_items.
+        Запросы prepare() не учитываются; status_code=None отключает проверку статуса
+        """
+        counts = []
+        for step in range(2):
+            self.step = step
+            if step:
+                self.grow()
+            args = (prepare(),) if prepare else ()
+            path = url(*args) if callable(url) else url
+            payload = data(*args) if callable(data) else data
+            kwargs = {} if method == 'get' else {'format': format}
+
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(self.client, method)(path, payload, **kwargs)
+                # Потоковые ответы выполняют запросы при чтении тела
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            if status_code is not None:
+                self.assertEqual(
+                    response.status_code, status_code,
+                    f'{method.upper()} {path}: {getattr(response, "data", None)}'
+                )
+            counts.append(context)
+
+        queries = '\n'.join(query['sql'] for query in counts[1].captured_queries)
+        self.assertLessEqual(
+            len(counts[1]), budget,
+            f'{method.upper()} {path}: {len(counts[1])} запросов при бюджете {budget}\n{queries}'
+        )
+        self.assertEqual(
+            len(counts[0]), len(counts[1]),
+            f'{method.upper()} {path}: число запросов растёт с объёмом данных '
+            f'({len(counts[0])} -> {len(counts[1])})\n{queries}'
+        )
+        return response
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN проверяется только на PostgreSQL')
+class IndexUsageTestCase(TestCase):
+    """Проверка планов запросов: применим ли к запросу нужный индекс"""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            # На тестовом объёме данных seq scan всегда дешевле: проверяем, что индекс применим
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
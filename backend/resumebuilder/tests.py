@@ -0,0 +1,191 @@
+import shutil
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from resume.models import Resume
+from resume.sample_data import create_sample_resume
+from .renderers import ORJSONRenderer
+from .timing import RequestTimings, _current_timings, timed
+
+
+class RequestTimingMiddlewareTest(TestCase):
+    """Заголовок Server-Timing и строка лога resumebuilder.timing"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        self.resume = create_sample_resume(2, user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def server_timing(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_header_and_log_line(self):
+        with self.assertLogs('resumebuilder.timing', 'INFO') as logs:
+            response = self.client.get(reverse('resume:list'))
+
+        entries = self.server_timing(response)
+        self.assertEqual(list(entries), ['db', 'view', 'serialize', 'render', 'total'])
+        self.assertRegex(entries['db']['desc'], r'^"[1-9]\d* queries"$')
+        self.assertGreaterEqual(float(entries['total']['dur']), float(entries['view']['dur']))
+
+        record = logs.records[0]
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertIn(f'path={reverse("resume:list")} status=200', record.getMessage())
+        self.assertEqual(record.timing['status'], 200)
+        self.assertEqual(record.timing['queries'], int(entries['db']['desc'].split()[0].strip('"')))
+
+    def test_export_time(self):
+        with self.assertLogs('resumebuilder.timing', 'INFO'):
+            response = self.client.get(reverse('resume:export_docx', args=[self.resume.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('export', self.server_timing(response))
+
+    @override_settings(REQUEST_TIMING={'SLOW_REQUEST_MS': 0, 'SLOWEST_QUERIES': 2})
+    def test_slow_request_logs_slowest_queries(self):
+        with self.assertLogs('resumebuilder.timing', 'INFO') as logs:
+            self.client.get(reverse('resume:list'))
+
+        record = logs.records[0]
+        self.assertEqual(record.levelname, 'WARNING')
+        self.assertTrue(record.getMessage().startswith('slow request '))
+        slowest = record.timing['slowest_queries']
+        self.assertEqual(len(slowest), 2)
+        self.assertGreaterEqual(slowest[0]['ms'], slowest[1]['ms'])
+        self.assertIn(slowest[0]['sql'][:200], record.getMessage())
+
+    def test_streaming_response_is_logged_when_stream_closes(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        with override_settings(EXPORT_CACHE={'DIR': Path(cache_dir)}, EXPORT_ARCHIVE={'WORKERS': 1}):
+            with self.assertLogs('resumebuilder.timing', 'INFO') as logs:
+                response = self.client.get(reverse('resume:export_archive'), {'format': 'docx'})
+                self.assertFalse(response.has_header('Server-Timing'))
+                # Резюме читаются и рендерятся при чтении тела
+                self.assertEqual(logs.records, [])
+                b''.join(response.streaming_content)
+                response.close()
+
+        self.assertEqual(len(logs.records), 1)
+        timing = logs.records[0].timing
+        self.assertGreater(timing['queries'], 1)
+        self.assertIn('export', timing)
+        self.assertGreaterEqual(timing['total'], timing['stream'])
+
+    @override_settings(REQUEST_TIMING={'ENABLED': False})
+    def test_disabled(self):
+        response = self.client.get(reverse('resume:list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_timed(self):
+        # Вне запроса замер ничего не делает
+        with timed('serialize'):
+            pass
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        try:
+            with timed('serialize'):
+                with timed('serialize'):
+                    pass
+        finally:
+            _current_timings.reset(token)
+        self.assertEqual(list(timings.durations), ['serialize'])
+
+
+class KeysetPaginationTest(TestCase):
+    """Курсорный режим PageNumberOrKeysetPagination на списке резюме"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        Resume.objects.bulk_create(Resume(user=user, title=f'Резюме {i}') for i in range(25))
+        # По три резюме на одно время изменения и создания: порядок внутри группы - по id
+        moment = timezone.now()
+        for index, pk in enumerate(Resume.objects.order_by('pk').values_list('pk', flat=True)):
+            Resume.objects.filter(pk=pk).update(
+                updated_at=moment - timedelta(minutes=index // 3),
+                created_at=moment - timedelta(minutes=(24 - index) // 3)
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.url = reverse('resume:list')
+
+    def walk(self, params, expected):
+        pages, url = [], None
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data['next']
+            if url is None:
+                break
+            response = self.client.get(url)
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+
+        # Обратно по ссылкам previous - те же страницы
+        back = []
+        while response.data['previous'] is not None:
+            response = self.client.get(response.data['previous'])
+            self.assertEqual(response.status_code, 200)
+            back.append([item['id'] for item in response.data['results']])
+        self.assertEqual(back, pages[-2::-1])
+        self.assertIsNone(response.data['previous'])
+
+    def test_updated_at_descending_with_ties(self):
+        expected = list(Resume.objects.order_by('-updated_at', '-pk').values_list('pk', flat=True))
+        self.walk({'pagination': 'cursor'}, expected)
+
+    def test_created_at_ascending_with_ties(self):
+        expected = list(Resume.objects.order_by('created_at', 'pk').values_list('pk', flat=True))
+        self.walk({'pagination': 'cursor', 'ordering': 'created_at'}, expected)
+
+    def test_invalid_cursor(self):
+        for cursor in ('не-курсор', 'WyJ0aXRsZSIsIHRydWUsICJ4IiwgMSwgZmFsc2Vd'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(self.url, {'cursor': cursor}).status_code, 404)
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """ORJSONRenderer отдаёт те же байты, что и JSONRenderer DRF"""
+
+    def assertSameJSON(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_types(self):
+        self.assertSameJSON({
+            'datetime': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2024, 5, 1, 12, 30),
+            'date': date(2024, 5, 1),
+            'time': time(9, 15, 30, 500000),
+            'timedelta': timedelta(hours=1, seconds=5),
+            'decimal': [Decimal('10.50'), Decimal('-0.001'), Decimal('1E+3')],
+            'lazy': gettext_lazy('Резюме'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'строка\u2028с разделителем\u2029',
+            'nested': [{'a': None, 'b': True}, (1, 2)],
+        })
+
+    def test_floats(self):
+        for value in (0.1, 100.0, -0.0, 1 / 3, 1e15, 1e16, 1e-5, 1.5e300, -2.5e-10):
+            with self.subTest(value=value):
+                self.assertSameJSON({'results': [{'value': value}]})
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                # Как и JSONRenderer со STRICT_JSON, а не молча null
+                ORJSONRenderer().render({'value': [value]})
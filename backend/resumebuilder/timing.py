@@ -0,0 +1,208 @@
+import heapq
+import logging
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current_timings = ContextVar('request_timings', default=None)
+
+# Порядок метрик в заголовке Server-Timing и в строке лога
+METRICS = ('db', 'view', 'serialize', 'render', 'export', 'stream', 'total')
+
+_END = object()
+
+
+def get_request_timing_config():
+    """Настройки замера запросов из settings.REQUEST_TIMING"""
+    config = getattr(settings, 'REQUEST_TIMING', {})
+    return {
+        'ENABLED': config.get('ENABLED', True),
+        'HEADER': config.get('HEADER', True),
+        'SLOW_REQUEST_MS': config.get('SLOW_REQUEST_MS', 500),
+        'SLOWEST_QUERIES': config.get('SLOWEST_QUERIES', 5),
+    }
+
+
+class RequestTimings:
+    """Время этапов и SQL-запросы одного HTTP-запроса"""
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = []
+        self._active = set()
+
+    def add(self, name, duration):
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+
+    def record_query(self, execute, sql, params, many, context):
+        """execute_wrapper соединения: время и текст каждого запроса"""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.add('db', duration)
+            self.queries.append((duration, sql))
+
+    def slowest_queries(self, count):
+        return heapq.nlargest(count, self.queries, key=lambda query: query[0])
+
+    def as_milliseconds(self):
+        return {name: round(self.durations[name] * 1000, 1) for name in METRICS if name in self.durations}
+
+
+@contextmanager
+def timed(name):
+    """
+    Учесть время блока (или функции, как декоратор) в метрике name текущего запроса.
+    Вложенные замеры с тем же именем не суммируются; вне запроса ничего не делает
+    """
+    timings = _current_timings.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+
+    timings._active.add(name)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, perf_counter() - start)
+        timings._active.discard(name)
+
+
+@contextmanager
+def _collecting(timings):
+    """Учитывать в timings SQL всех соединений потока и замеры timed()"""
+    token = _current_timings.set(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings.record_query))
+            yield
+    finally:
+        _current_timings.reset(token)
+
+
+class RequestTimingMiddleware:
+    """
+    Замер времени запроса по этапам: SQL (число и время запросов), view,
+    сериализация, рендеринг ответа и генерация файлов экспорта.
+    Итог отдаётся в заголовке Server-Timing и пишется в лог resumebuilder.timing:
+    медленные запросы - WARNING вместе с самыми долгими SQL, остальные - INFO.
+    Ставится первым в MIDDLEWARE, чтобы учитывать запросы остальных middleware.
+
+    У потоковых ответов (архив резюме, файлы) основная работа идёт при чтении тела,
+    после отправки заголовков, поэтому Server-Timing у них нет: замер продолжается
+    до закрытия потока (метрика stream) и логируется в конце. SQL и рендеринг
+    в потоках пула архива не учитываются - только время ожидания их результатов
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_request_timing_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        request._timings = timings
+        start = perf_counter()
+        with _collecting(timings):
+            response = self.get_response(request)
+
+        # Ответ без рендеринга: view закончился вместе с get_response
+        end = perf_counter()
+        self._stop(request, 'view', end)
+        self._stop(request, 'render', end)
+
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._stream(
+                response.streaming_content, request, response, timings, config, start
+            )
+            return response
+
+        timings.add('total', end - start)
+        if response.streaming:
+            self.log(request, response, timings, config)
+            return response
+
+        if config['HEADER']:
+            self.set_header(response, timings)
+        self.log(request, response, timings, config)
+        return response
+
+    def _stream(self, content, request, response, timings, config, start):
+        """Тело потокового ответа с замером каждого фрагмента; итог логируется при закрытии"""
+        try:
+            while True:
+                chunk_start = perf_counter()
+                with _collecting(timings):
+                    chunk = next(content, _END)
+                timings.add('stream', perf_counter() - chunk_start)
+                if chunk is _END:
+                    break
+                yield chunk
+        finally:
+            timings.add('total', perf_counter() - start)
+            self.log(request, response, timings, config)
+
+    def _stop(self, request, name, end):
+        started = request.__dict__.pop(f'_timing_{name}_start', None)
+        if started is not None:
+            request._timings.add(name, end - started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_timings'):
+            request._timing_view_start = perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF Response рендерится после всех process_template_response
+        if hasattr(request, '_timings'):
+            now = perf_counter()
+            self._stop(request, 'view', now)
+            request._timing_render_start = now
+        return response
+
+    def set_header(self, response, timings):
+        entries = []
+        for name, value in timings.as_milliseconds().items():
+            if name == 'db':
+                entries.append(f'db;dur={value};desc="{len(timings.queries)} queries"')
+            else:
+                entries.append(f'{name};dur={value}')
+        if response.has_header('Server-Timing'):
+            entries.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(entries)
+
+    def log(self, request, response, timings, config):
+        metrics = timings.as_milliseconds()
+        slow_ms = config['SLOW_REQUEST_MS']
+        slow = slow_ms is not None and metrics['total'] >= slow_ms
+        if not slow and not logger.isEnabledFor(logging.INFO):
+            return
+        line = ' '.join(
+            [f'method={request.method}', f'path={request.path}', f'status={response.status_code}',
+             f'queries={len(timings.queries)}'] +
+            [f'{name}_ms={value}' for name, value in metrics.items()]
+        )
+        extra = {'timing': dict(
+            metrics, method=request.method, path=request.path,
+            status=response.status_code, queries=len(timings.queries)
+        )}
+
+        if not slow:
+            logger.info('request %s', line, extra=extra)
+            return
+
+        slowest = timings.slowest_queries(config['SLOWEST_QUERIES'])
+        extra['timing']['slowest_queries'] = [
+            {'ms': round(duration * 1000, 1), 'sql': sql} for duration, sql in slowest
+        ]
+        details = ''.join(f'\n  {duration * 1000:.1f}ms {sql[:1000]}' for duration, sql in slowest)
+        logger.warning('slow request %s%s', line, details, extra=extra)
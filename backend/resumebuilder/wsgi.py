@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "resumebuilder.settings")
 
 application = get_wsgi_application()
+
+# Прогреваем пул процессов WeasyPrint до первого экспорта
+from resume.render_pool import warm_up_render_pool  # noqa: E402
+
+warm_up_render_pool()
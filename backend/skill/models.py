@@ -49,6 +49,9 @@ class Skill(models.Model):
         verbose_name = 'Навык'
         verbose_name_plural = 'Навыки'
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['resume', 'order', '-id'], name='skill_resume_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_level_display()})"
\ No newline at end of file
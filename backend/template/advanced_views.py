@@ -20,7 +20,7 @@ class TemplateSearchView(APIView):
     
     def get(self, request):
         # Начальный queryset
-        queryset = Template.objects.all()
+        queryset = Template.objects.select_related('created_by')
         
         # Если не админ, показываем только активные
         if not (request.user.is_authenticated and request.user.is_staff):
@@ -82,7 +82,7 @@ class TemplatePopularView(APIView):
         limit = int(request.query_params.get('limit', 5))
         
         # Только активные шаблоны для обычных пользователей
-        queryset = Template.objects.filter(is_active=True)
+        queryset = Template.objects.filter(is_active=True).select_related('created_by')
         
         # Аннотируем количество использований и сортируем
         queryset = queryset.annotate(
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("template", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="template",
+            index=models.Index(
+                fields=["is_active", "-created_at"], name="template_active_created_idx"
+            ),
+        ),
+    ]
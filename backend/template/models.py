@@ -49,6 +49,10 @@ class Template(models.Model):
         verbose_name = 'Шаблон'
         verbose_name_plural = 'Шаблоны'
         ordering = ['-created_at']
+        indexes = [
+            # Список активных шаблонов: is_active=True, сортировка -created_at
+            models.Index(fields=['is_active', '-created_at'], name='template_active_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,3 +1,105 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from resumebuilder.testing import IndexUsageTestCase, QueryBudgetTestCase
+from .models import Template
 
-# Create your tests here.
+
+class TemplateIndexesTest(IndexUsageTestCase):
+    """Список активных шаблонов идёт по составному индексу"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Template.objects.bulk_create(
+            Template(name=f'Шаблон {i}', html_structure='', css_styles='', is_active=i % 3 != 0)
+            for i in range(100)
+        )
+
+    def test_active_templates_use_active_created_index(self):
+        self.assertUsesIndex(
+            Template.objects.filter(is_active=True).order_by('-created_at'), 'template_active_created_idx'
+        )
+
+
+class TemplateConditionalGetTest(TestCase):
+    """ETag списка и детальной страницы шаблонов"""
+
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com')
+        self.template = Template.objects.create(
+            name='Классический', html_structure='<h1>{{full_name}}</h1>', css_styles='h1 {}', created_by=admin
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def assertRevalidates(self, url):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Массовая деактивация не меняет updated_at, но меняет ответ
+        Template.objects.filter(pk=self.template.pk).update(is_active=False)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_list(self):
+        self.assertRevalidates(reverse('template:list'))
+
+    def test_detail(self):
+        self.assertRevalidates(reverse('template:detail', args=[self.template.pk]))
+
+
+class TemplateQueryBudgetTest(QueryBudgetTestCase):
+    """Бюджет запросов маршрутов шаблонов: api/templates/"""
+
+    data = {
+        'name': 'Новый шаблон', 'description': 'Описание',
+        'html_structure': '<h1>{{full_name}}</h1>', 'css_styles': 'h1 {}'
+    }
+
+    def new_template(self):
+        return Template.objects.create(
+            name='Свободный шаблон', html_structure='<h1>{{full_name}}</h1>', css_styles='', created_by=self.admin
+        )
+
+    def test_public(self):
+        self.client.force_authenticate(None)
+        self.assertQueryBudget(3, 'get', reverse('template:list'))
+        self.assertQueryBudget(3, 'get', reverse('template:detail', args=[self.template.pk]))
+        self.assertQueryBudget(2, 'get', reverse('template:search'), {'q': 'шаблон', 'sort': 'popular'})
+        self.assertQueryBudget(1, 'get', reverse('template:popular'))
+
+    def test_admin(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(2, 'get', reverse('template:admin_list'))
+        self.assertQueryBudget(6, 'get', reverse('template:admin_stats'))
+        self.assertQueryBudget(2, 'post', reverse('template:admin_create'), self.data, status_code=201)
+        self.assertQueryBudget(
+            4, 'patch', lambda template: reverse('template:admin_update', args=[template.pk]),
+            {'description': 'Новое описание'}, prepare=self.new_template
+        )
+        self.assertQueryBudget(
+            4, 'delete', lambda template: reverse('template:admin_delete', args=[template.pk]),
+            status_code=204, prepare=self.new_template
+        )
+
+    def test_bulk_operations(self):
+        self.client.force_authenticate(self.admin)
+        url = reverse('template:admin_bulk_operations')
+
+        def templates():
+            return [self.new_template().pk for _ in range(3)]
+
+        # Удаление проверяет каждый шаблон отдельно: запросы растут с числом id в запросе,
+        # но не с числом шаблонов в базе
+        for action, budget in (('activate', 2), ('deactivate', 2), ('delete', 11)):
+            with self.subTest(action=action):
+                self.assertQueryBudget(
+                    budget, 'post', url, lambda ids: {'action': action, 'template_ids': ids}, prepare=templates
+                )
+
+    def test_admin_site(self):
+        self.client.force_login(self.admin)
+        self.assertQueryBudget(7, 'get', reverse('admin:template_template_changelist'))
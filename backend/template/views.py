@@ -2,6 +2,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from resume.conditional import ConditionalGetMixin, make_etag
 from .models import Template
 from .serializers import (
     TemplateListSerializer,
@@ -10,7 +11,7 @@ from .serializers import (
 )
 
 
-class TemplateListView(generics.ListAPIView):
+class TemplateListView(ConditionalGetMixin, generics.ListAPIView):
     """Список всех активных шаблонов"""
     serializer_class = TemplateListSerializer
     permission_classes = [permissions.AllowAny]
@@ -21,12 +22,24 @@ class TemplateListView(generics.ListAPIView):
 
     def get_queryset(self):
         # Обычные пользователи видят только активные шаблоны
+        queryset = Template.objects.select_related('created_by')
         if self.request.user.is_authenticated and self.request.user.is_staff:
-            return Template.objects.all()
-        return Template.objects.filter(is_active=True)
-
-
-class TemplateDetailView(generics.RetrieveAPIView):
+            return queryset
+        return queryset.filter(is_active=True)
+
+    def get_etag(self, request, *args, **kwargs):
+        """ETag по версиям отфильтрованных шаблонов, без загрузки HTML/CSS"""
+        # is_active меняется массовыми операциями через update() без updated_at
+        rows = self.filter_queryset(self.get_queryset()).values_list(
+            'pk', 'updated_at', 'is_active', 'created_by__username'
+        )
+        return make_etag(
+            'templates', request.build_absolute_uri(), request.user.is_staff,
+            request.accepted_renderer.format, *rows
+        )
+
+
+class TemplateDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Детальная информация о шаблоне с HTML и CSS"""
     serializer_class = TemplateDetailSerializer
     permission_classes = [permissions.AllowAny]
@@ -37,6 +50,15 @@ class TemplateDetailView(generics.RetrieveAPIView):
             return Template.objects.all()
         return Template.objects.filter(is_active=True)
 
+    def get_etag(self, request, pk):
+        """ETag по времени изменения шаблона, без загрузки HTML/CSS"""
+        row = self.get_queryset().filter(pk=pk).values_list(
+            'updated_at', 'is_active', 'created_by__username'
+        ).first()
+        if row is None:
+            return None
+        return make_etag('template', pk, *row, request.get_host(), request.accepted_renderer.format)
+
 
 class AdminTemplateCreateView(generics.CreateAPIView):
     """Создание нового шаблона (только для админов)"""
@@ -103,7 +125,7 @@ class AdminTemplateDeleteView(generics.DestroyAPIView):
 
 class AdminTemplateListView(generics.ListAPIView):
     """Список всех шаблонов для админов (включая неактивные)"""
-    queryset = Template.objects.all()
+    queryset = Template.objects.select_related('created_by')
     serializer_class = TemplateDetailSerializer
     permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["-created_at", "-id"], name="user_created_idx"),
+        ),
+    ]
@@ -25,6 +25,10 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ['-created_at']
+        indexes = [
+            # Курсорная пагинация списка пользователей по (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='user_created_idx'),
+        ]
 
     def __str__(self):
         return self.username
\ No newline at end of file
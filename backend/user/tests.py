@@ -1,3 +1,77 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from resumebuilder.testing import PASSWORD, QueryBudgetTestCase
+from resume.sample_data import create_sample_resume
+from .models import User
 
-# Create your tests here.
+
+class UserQueryBudgetTest(QueryBudgetTestCase):
+    """Бюджет запросов маршрутов пользователей: api/users/"""
+
+    def new_user(self):
+        number = User.objects.count()
+        user = User.objects.create_user(
+            username=f'member-{number}', email=f'member-{number}@example.com', password=PASSWORD
+        )
+        # После grow() у пользователя больше резюме и элементов в них
+        for _ in range(1 + self.step):
+            create_sample_resume(self.grown_items, user=user, template=self.template)
+        return user
+
+    def test_register(self):
+        def data(number):
+            return {
+                'username': f'new-{number}', 'email': f'new-{number}@example.com',
+                'password': PASSWORD, 'password2': PASSWORD
+            }
+
+        self.client.force_authenticate(None)
+        self.assertQueryBudget(
+            3, 'post', reverse('user:register'), data, status_code=201, prepare=User.objects.count
+        )
+
+    def test_login(self):
+        self.client.force_authenticate(None)
+        self.assertQueryBudget(1, 'post', reverse('user:login'), {'username': 'owner', 'password': PASSWORD})
+
+    def test_token_refresh(self):
+        self.client.force_authenticate(None)
+        self.assertQueryBudget(
+            0, 'post', reverse('user:token_refresh'), lambda refresh: {'refresh': str(refresh)},
+            prepare=lambda: RefreshToken.for_user(self.owner)
+        )
+
+    def test_profile(self):
+        url = reverse('user:profile')
+        self.assertQueryBudget(0, 'get', url)
+        self.assertQueryBudget(1, 'patch', url, {'first_name': 'Иван'})
+        self.assertQueryBudget(
+            5, 'put', url, {'username': 'owner', 'email': 'owner@example.com', 'first_name': 'Иван', 'last_name': 'Иванов'}
+        )
+
+    def test_change_password(self):
+        self.assertQueryBudget(
+            1, 'post', reverse('user:change_password'),
+            {'old_password': PASSWORD, 'new_password': 'Another-456', 'new_password2': 'Another-456'},
+            prepare=lambda: self.owner.set_password(PASSWORD)
+        )
+
+    def test_admin_users(self):
+        self.client.force_authenticate(self.admin)
+        url = reverse('user:admin_user_list')
+        self.assertQueryBudget(3, 'get', url)
+        self.assertQueryBudget(2, 'get', url, {'pagination': 'cursor'})
+
+        def detail_url(user):
+            return reverse('user:admin_user_detail', args=[user.pk])
+
+        self.assertQueryBudget(1, 'get', detail_url, prepare=self.new_user)
+        self.assertQueryBudget(2, 'patch', detail_url, {'first_name': 'Пётр'}, prepare=self.new_user)
+        self.assertQueryBudget(24, 'delete', detail_url, status_code=204, prepare=self.new_user)
+        self.assertQueryBudget(
+            2, 'post', lambda user: reverse('user:admin_block_user', args=[user.pk]), prepare=self.new_user
+        )
+
+    def test_admin_site(self):
+        self.client.force_login(self.admin)
+        self.assertQueryBudget(6, 'get', reverse('admin:user_user_changelist'))
@@ -5,6 +5,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from resumebuilder.pagination import PageNumberOrKeysetPagination
 from .models import User
 from .serializers import (
     UserRegistrationSerializer,
@@ -152,6 +153,9 @@ class AdminUserListView(generics.ListAPIView):
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['created_at', 'username', 'email', 'last_login']
     ordering = ['-created_at']
+    # ?pagination=cursor - курсорная пагинация по (created_at, id) без COUNT(*) и OFFSET
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering_fields = ('created_at',)
     
     def get_queryset(self):
         """Оптимизация запросов с подсчетом резюме"""
@@ -42,6 +42,9 @@ class WorkExperience(models.Model):
         verbose_name = 'Опыт работы'
         verbose_name_plural = 'Опыт работы'
         ordering = ['order', '-start_date']
+        indexes = [
+            models.Index(fields=['resume', 'order', '-id'], name='work_exp_resume_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.company} - {self.position}"
\ No newline at end of file
@@ -108,7 +108,11 @@ const API = {
 
     resumes: {
         list: () => apiRequest('/resumes/'),
-        get: (id) => apiRequest(`/resumes/${id}/`),
+        // params: { fields: 'id,title', include: 'education,skills' } - только нужные поля и секции
+        get: (id, params = {}) => {
+            const query = new URLSearchParams(params).toString();
+            return apiRequest(`/resumes/${id}/${query ? `?${query}` : ''}`);
+        },
         create: (data) => apiRequest('/resumes/create/', {
             method: 'POST',
             body: JSON.stringify(data)